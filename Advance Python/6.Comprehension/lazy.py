@@ -0,0 +1,288 @@
+# Lazy, Chunked Comprehension Pipelines
+#
+# main.py builds every result in full: the multiplication table is a list of
+# lists (one int object per cell), zip() results are wrapped in list(...), and
+# zip(*zipped) unpacks the whole zipped list into one call's arguments. At
+# 10^4 x 10^4 cells or 10^8 pairs that is gigabytes.
+#
+# This module does the same work in bounded memory:
+#
+#   Lazy(numbers).map(square).filter(is_even).zip(labels)
+#       - each stage works on chunks of at most CHUNK_SIZE items, so memory
+#         holds one chunk per stage however long the input is, and the inner
+#         loops run in C (map/filter/zip over a chunk)
+#       - nothing runs until the result is consumed: iterate it, or call
+#         to_list() / to_array() / sum() / count(). A Lazy is single-use.
+#
+#   unzip(pairs, 2)            - zip(*pairs) without the splat: one lazy iterator
+#                                per position. Consumed side by side, only a few
+#                                items are ever buffered.
+#   unzip_columns(pairs, "qq") - unzip straight into compact arrays
+#
+#   Table(10_000, 10_000)      - the multiplication table as a 2-D view: cells
+#                                and rows are computed when read. materialize()
+#                                stores it in one flat array (8 bytes per cell).
+#
+# Run `python lazy.py --bench` for peak memory against the list-based code.
+
+import multiprocessing
+import operator
+import sys
+import time
+import tracemalloc
+from array import array
+from itertools import chain, islice, repeat, tee
+
+try:
+    import resource  # Peak memory of a process (Unix)
+except ImportError:
+    resource = None
+
+CHUNK_SIZE = 4096
+LIST_LIMIT = 10_000_000  # Largest list-based run the benchmark measures (larger ones are scaled)
+
+
+def _chunked(iterator, size):
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Lazy:
+    """A chain of map/filter/zip stages evaluated one chunk at a time."""
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._chunks = _chunked(iter(source), chunk_size)
+
+    def _then(self, chunks):
+        lazy = Lazy.__new__(Lazy)
+        lazy.chunk_size = self.chunk_size
+        lazy._chunks = chunks
+        return lazy
+
+    def map(self, func):
+        return self._then(list(map(func, chunk)) for chunk in self._chunks)
+
+    def starmap(self, func):
+        """func(*item) for each item (e.g. after zip)."""
+        return self._then([func(*item) for item in chunk] for chunk in self._chunks)
+
+    def filter(self, func):
+        """Keeps items where func(item) is true (func=None keeps truthy items)."""
+        return self._then(kept for chunk in self._chunks if (kept := list(filter(func, chunk))))
+
+    def zip(self, *others):
+        """Pairs each item with the next item of every other iterable; stops at the shortest."""
+        iterators = [iter(other) for other in others]
+
+        def chunks():
+            for chunk in self._chunks:
+                zipped = list(zip(chunk, *(islice(it, len(chunk)) for it in iterators)))
+                if zipped:
+                    yield zipped
+                if len(zipped) < len(chunk):
+                    return
+
+        return self._then(chunks())
+
+    def chunks(self):
+        """The lists of items, one chunk at a time."""
+        return self._chunks
+
+    def __iter__(self):
+        return chain.from_iterable(self._chunks)
+
+    def to_list(self):
+        return list(self)
+
+    def to_array(self, typecode="q"):
+        values = array(typecode)
+        for chunk in self._chunks:
+            values.extend(chunk)
+        return values
+
+    def sum(self, start=0):
+        return sum(map(sum, self._chunks), start)
+
+    def count(self):
+        return sum(map(len, self._chunks))
+
+
+def unzip(iterable, n):
+    """Streaming zip(*iterable): n iterators, the i-th yielding position i of every item.
+
+    Read them side by side (zip them again, or map over them together); reading
+    one to the end first buffers every item for the others.
+    """
+    copies = tee(iterable, n)
+    return tuple(map(operator.itemgetter(i), copy) for i, copy in enumerate(copies))
+
+
+def unzip_columns(iterable, typecodes, chunk_size=CHUNK_SIZE):
+    """Unzips tuples into one array per position (typecodes like "qd"), a chunk at a time."""
+    columns = tuple(array(typecode) for typecode in typecodes)
+    for chunk in _chunked(iter(iterable), chunk_size):
+        for column, values in zip(columns, zip(*chunk)):  # Only one chunk is splatted
+            column.extend(values)
+    return columns
+
+
+class Table:
+    """A rows x cols table of func(row value, column value), values counted from start.
+
+    Table(5, 5) holds the same numbers as main.py's
+    [[x * y for x in range(1, 6)] for y in range(1, 6)].
+    """
+
+    def __init__(self, rows, cols, func=operator.mul, start=1, typecode="q"):
+        self.rows = rows
+        self.cols = cols
+        self.func = func
+        self.start = start
+        self.typecode = typecode
+        self.cells = None  # Flat row-major array once materialize() has run
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def __len__(self):
+        return self.rows
+
+    def row(self, r):
+        """Row r as an array (a slice of the stored cells, or computed)."""
+        if not 0 <= r < self.rows:
+            raise IndexError("table row out of range")
+        if self.cells is not None:
+            return self.cells[r * self.cols:(r + 1) * self.cols]
+        column_values = range(self.start, self.start + self.cols)
+        return array(self.typecode, map(self.func, repeat(r + self.start, self.cols), column_values))
+
+    def __getitem__(self, key):
+        """table[r] is row r; table[r, c] is one cell."""
+        if isinstance(key, tuple):
+            r, c = key
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                raise IndexError("table index out of range")
+            if self.cells is not None:
+                return self.cells[r * self.cols + c]
+            return self.func(r + self.start, c + self.start)
+        return self.row(key)
+
+    def __iter__(self):
+        for r in range(self.rows):
+            yield self.row(r)
+
+    def materialize(self):
+        """Computes every cell into one flat array; later reads come from it."""
+        if self.cells is None:
+            cells = array(self.typecode)
+            for row in self:
+                cells.extend(row)
+            self.cells = cells
+        return self
+
+    def tolist(self):
+        """The nested lists main.py builds."""
+        return [row.tolist() for row in self]
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _list_table(n, rows):
+    table = [[x * y for x in range(1, n + 1)] for y in range(1, rows + 1)]
+    return sum(map(sum, table))
+
+
+def _lazy_table(n, rows):
+    return sum(map(sum, Table(rows, n)))
+
+
+def _flat_table(n, rows):
+    return sum(Table(rows, n).materialize().cells)
+
+
+def _list_zip(n):
+    zipped = list(zip(range(n), range(n)))
+    unzipped = list(zip(*zipped))
+    return sum(unzipped[0]) - sum(unzipped[1])
+
+
+def _lazy_zip(n):
+    firsts, seconds = unzip(Lazy(range(n)).zip(range(n)), 2)
+    return sum(map(operator.sub, firsts, seconds))
+
+
+def _measure_child(conn, func, args):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    conn.send((grown if sys.platform == "darwin" else grown * 1024, elapsed))  # Linux reports KiB
+
+
+def _peak_memory(func, *args):
+    """(peak memory growth in bytes, seconds) of func(*args), run in a fresh process."""
+    if resource is None:  # No rusage (Windows): trace Python allocations instead (much slower)
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak, elapsed
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_measure_child, args=(sender, func, args))
+    process.start()
+    result = receiver.recv()
+    process.join()
+    return result
+
+
+def _mb(value):
+    return f"{value / 2**20:,.0f} MB"
+
+
+def benchmark(table_size=10_000, zip_size=100_000_000):
+    """Peak memory of main.py's list-based code against the lazy versions.
+
+    List-based runs larger than LIST_LIMIT items are measured on a part of the
+    input and scaled up (marked ~).
+    """
+    print(f"{'workload':>30} {'peak memory':>14} {'time':>8}")
+    list_rows = min(table_size, max(1, LIST_LIMIT // table_size))
+    scale = table_size / list_rows
+    cases = [
+        (f"{table_size:,}^2 table: nested lists", _list_table, (table_size, list_rows), scale),
+        (f"{table_size:,}^2 table: Table rows", _lazy_table, (table_size, table_size), 1),
+        (f"{table_size:,}^2 table: flat array", _flat_table, (table_size, table_size), 1),
+        (f"zip+unzip {zip_size:,}: lists", _list_zip, (min(zip_size, LIST_LIMIT),),
+         zip_size / min(zip_size, LIST_LIMIT)),
+        (f"zip+unzip {zip_size:,}: lazy", _lazy_zip, (zip_size,), 1),
+    ]
+    for label, func, args, scale in cases:
+        peak, elapsed = _peak_memory(func, *args)
+        mark = "~" if scale > 1 else " "
+        print(f"{label:>30} {mark}{_mb(peak * scale):>13} {mark}{elapsed * scale:>6.1f}s")
+
+
+if __name__ == "__main__":
+    print(Lazy(range(10)).filter(lambda x: x % 2 == 0).map(lambda x: x ** 2).to_list())
+    # [0, 4, 16, 36, 64]
+    print(Table(5, 5).tolist() == [[x * y for x in range(1, 6)] for y in range(1, 6)])  # True
+    print(Table(5, 5)[2, 3], Table(5, 5)[4].tolist())  # 12 [5, 10, 15, 20, 25]
+
+    list1 = ["a", "b", "c"]
+    list2 = [1, 2, 3]
+    zipped = Lazy(list1).zip(list2)
+    letters, numbers = unzip(zipped, 2)
+    print(list(zip(letters, numbers)))  # [('a', 1), ('b', 2), ('c', 3)]
+    print(unzip_columns(Lazy(list2).zip([100, 200, 300]), "qq"))
+    # (array('q', [1, 2, 3]), array('q', [100, 200, 300]))
+    print(Lazy(list1).zip(list2).starmap("{}-{}".format).to_list())  # ['a-1', 'b-2', 'c-3']
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,258 @@
+# Batch Validation Without Per-Record Exceptions
+#
+# check_age() raises UnderageError for every bad age and safe_divide() catches
+# ZeroDivisionError and returns the string "Error: Cannot divide by zero!", so
+# a batch of records is checked one call (and one exception) at a time, and
+# the results are a mix of numbers and error strings. Raising and catching an
+# exception costs several times a normal call: when 30% of a batch is bad,
+# the exceptions are most of the work.
+#
+# The batch versions take whole sequences and never raise per record:
+#
+#   check_ages(ages)          - BatchResult: results = 1 (access granted) / 0
+#   safe_divides(nums, dens)  - BatchResult: results = array('d') of quotients,
+#                               NaN where the division failed
+#
+# A BatchResult also has
+#   status  - a bytearray with one status code per record (OK, UNDERAGE, ...)
+#   mask    - a bytearray, 1 where the record failed
+#   counts  - {status code: number of records} for every error code
+#   failed(code) - the indices of the failed records (of one kind, or all)
+#
+# The comparisons run over the whole sequence in C (map with operator
+# functions); Python code only runs for the records that fail, or for input
+# that is not all numbers.
+#
+# strict=True raises one BatchValidationError for the whole batch, carrying
+# every failing index, instead of returning a result with errors in it.
+#
+# Run `python batch_validation.py --bench` to compare with check_age/safe_divide.
+
+import math
+import operator
+import random
+import sys
+import time
+from array import array
+from itertools import repeat
+
+from main import UnderageError, check_age, safe_divide
+
+AGE_LIMIT = 18
+
+# Status codes
+OK = 0
+UNDERAGE = 1
+ZERO_DIVISION = 2
+INVALID = 3  # Not a number (None, a string, NaN age, or a quotient too large for a float)
+
+STATUS_MESSAGES = {
+    OK: "OK.",
+    UNDERAGE: "You must be 18 or older.",
+    ZERO_DIVISION: "Error: Cannot divide by zero!",
+    INVALID: "Not a number.",
+}
+
+_ERROR_FLAG = bytes([0] + [1] * 255)  # Status code -> 1 if it is an error
+_GRANTED = bytes([1] + [0] * 255)     # Status code -> 1 if access is granted
+_AS_UNDERAGE = bytes([OK, UNDERAGE] + [0] * 254)  # 0/1 flag -> status code
+_AS_ZERO_DIVISION = bytes([OK, ZERO_DIVISION] + [0] * 254)
+
+
+def _positions(flags, value=1):
+    """Indices where a bytearray holds value (bytearray.find does the scanning)."""
+    index = flags.find(value)
+    while index >= 0:
+        yield index
+        index = flags.find(value, index + 1)
+
+
+def _sequence(values):
+    return values if isinstance(values, (list, tuple, range, array)) else list(values)
+
+
+class BatchValidationError(Exception):
+    """Raised once for a batch in strict mode; carries every failing index."""
+
+    def __init__(self, result, message=None):
+        self.result = result
+        self.counts = result.counts
+        self.indices = {code: result.failed(code) for code, count in self.counts.items() if count}
+        self.failed = result.failed()
+        if message is None:
+            kinds = ", ".join(f"{count} x {STATUS_MESSAGES[code]!r}"
+                              for code, count in self.counts.items() if count)
+            message = f"{len(self.failed)} of {len(result)} records failed: {kinds}"
+        self.message = message
+        super().__init__(self.message)
+
+
+class BatchResult:
+    """Outcome of a batch check: a result and a status code per record."""
+
+    def __init__(self, results, status):
+        self.results = results
+        self.status = status
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def mask(self):
+        """1 for every failed record, 0 for the others."""
+        return bytearray(self.status.translate(_ERROR_FLAG))
+
+    @property
+    def counts(self):
+        """{status code: failed records} for every error code (zeros included)."""
+        return {code: self.status.count(code) for code in STATUS_MESSAGES if code != OK}
+
+    @property
+    def errors(self):
+        return len(self.status) - self.status.count(OK)
+
+    def failed(self, code=None):
+        """Indices of the records that failed (with status code, if given)."""
+        if code is None:
+            return list(_positions(self.mask))
+        return list(_positions(self.status, code))
+
+    def raise_errors(self):
+        """Raises a BatchValidationError if any record failed."""
+        if self.errors:
+            raise BatchValidationError(self)
+        return self
+
+
+# =====================
+# Ages
+# =====================
+
+# The fallbacks run the same comparisons as the fast paths, one record at a
+# time, so a record's status never depends on the rest of its batch.
+
+def _age_status(age, limit):
+    try:
+        if age != age:  # Only NaN
+            return INVALID
+        return UNDERAGE if age < limit else OK
+    except (TypeError, ArithmeticError):  # None, a string, Decimal("sNaN"), ...
+        return INVALID
+
+
+def check_ages(ages, limit=AGE_LIMIT, strict=False):
+    """check_age for a whole sequence; results[i] is 1 where access is granted."""
+    ages = _sequence(ages)
+    try:
+        underage = bytearray(map(operator.lt, ages, repeat(limit)))
+        status = bytearray(underage.translate(_AS_UNDERAGE))
+        for index in _positions(bytearray(map(operator.ne, ages, ages))):  # NaN
+            status[index] = INVALID
+    except (TypeError, ArithmeticError):  # Something that is not a number: classify one by one
+        status = bytearray(map(_age_status, ages, repeat(limit)))
+    result = BatchResult(bytearray(status.translate(_GRANTED)), status)
+    return result.raise_errors() if strict else result
+
+
+# =====================
+# Division
+# =====================
+
+def _divide_status(a, b):
+    try:
+        if b == 0:
+            return ZERO_DIVISION
+        float(a / b)  # What array("d") stores
+    except (TypeError, ArithmeticError):  # Not numbers, or too large for a float
+        return INVALID
+    return OK
+
+
+def _quotient(a, b, status):
+    return float(a / b) if status == OK else math.nan
+
+
+def safe_divides(numerators, denominators, strict=False):
+    """safe_divide for two sequences; results[i] is numerators[i] / denominators[i], or NaN."""
+    numerators, denominators = _sequence(numerators), _sequence(denominators)
+    if len(numerators) != len(denominators):
+        raise ValueError("numerators and denominators have different lengths")
+    try:
+        zero = bytearray(map(operator.eq, denominators, repeat(0)))  # 0, 0.0 (not None or "")
+        status = bytearray(zero.translate(_AS_ZERO_DIVISION))
+        divisors = denominators
+        if status.count(ZERO_DIVISION):
+            divisors = list(denominators)
+            for index in _positions(zero):
+                divisors[index] = math.nan  # x / nan is nan: no exception in the C loop
+        results = array("d", map(operator.truediv, numerators, divisors))
+    except (TypeError, ArithmeticError):  # Non-numbers or huge quotients: one by one
+        status = bytearray(map(_divide_status, numerators, denominators))
+        results = array("d", map(_quotient, numerators, denominators, status))
+    result = BatchResult(results, status)
+    return result.raise_errors() if strict else result
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _per_record_ages(ages):
+    granted = 0
+    for age in ages:
+        try:
+            check_age(age)
+            granted += 1
+        except UnderageError:
+            pass
+    return granted
+
+
+def _per_record_divides(numerators, denominators):
+    results = [safe_divide(a, b) for a, b in zip(numerators, denominators)]
+    return sum(isinstance(value, str) for value in results)  # The error strings
+
+
+def benchmark(n=1_000_000, bad_fractions=(0.0, 0.3)):
+    """Records/second for the per-record functions and the batch ones."""
+    rng = random.Random(0)
+    print(f"{n:,} records")
+    print(f"{'bad':>5} {'check':>24} {'records/s':>12}")
+    for bad in bad_fractions:
+        ages = [rng.randint(0, 17) if rng.random() < bad else rng.randint(18, 90) for _ in range(n)]
+        numerators = [rng.uniform(1, 100) for _ in range(n)]
+        denominators = [0 if rng.random() < bad else rng.randint(1, 50) for _ in range(n)]
+        underage = sum(age < AGE_LIMIT for age in ages)
+        zeros = denominators.count(0)
+        for label, run, errors, expected in (
+                ("check_age per record", lambda: n - _per_record_ages(ages), int, underage),
+                ("check_ages", lambda: check_ages(ages), BatchResult.errors.fget, underage),
+                ("safe_divide per record", lambda: _per_record_divides(numerators, denominators), int, zeros),
+                ("safe_divides", lambda: safe_divides(numerators, denominators), BatchResult.errors.fget, zeros)):
+            start = time.perf_counter()
+            outcome = run()
+            elapsed = time.perf_counter() - start
+            assert errors(outcome) == expected
+            print(f"{bad:>5.0%} {label:>24} {n / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    result = check_ages([25, 16, 40, 12, float("nan")])
+    print(list(result.results), list(result.mask))  # [1, 0, 1, 0, 0] [0, 1, 0, 1, 1]
+    print(result.counts)  # {1: 2, 2: 0, 3: 1}
+    print(result.failed(UNDERAGE))  # [1, 3]
+
+    quotients = safe_divides([10, 7, 1, 9], [2, 0, 4, None])
+    print(list(quotients.results))  # [5.0, nan, 0.25, nan]
+    print([STATUS_MESSAGES[code] for code in quotients.status])
+    # ['OK.', 'Error: Cannot divide by zero!', 'OK.', 'Not a number.']
+
+    try:
+        check_ages([30, 17, 15, 64], strict=True)
+    except BatchValidationError as e:
+        print(f"BatchValidationError: {e}")
+        # BatchValidationError: 2 of 4 records failed: 2 x 'You must be 18 or older.'
+        print(e.failed)  # [1, 2]
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,310 @@
+# Chunked and Memory-Mapped File Reading
+#
+# read_file() in main.py calls file.read(): the whole file becomes one string,
+# so a 2 GB log needs 2 GB of memory (more once decoded) before the first line
+# can be looked at.
+#
+# FileReader reads a file piece by piece instead:
+#
+#   with FileReader("app.log") as reader:
+#       for chunk in reader.chunks():        - bytes, CHUNK_SIZE at a time
+#       for chunk in reader.chunks(reuse=True)  - memoryviews of one reused buffer
+#       for text in reader.text_chunks():    - str; a character split between
+#                                              two chunks is decoded whole
+#       for line in reader.lines():          - memoryview slices of an mmap:
+#                                              no copy, the OS pages the file in
+#       for line in reader.follow():         - like `tail -F`: waits for lines
+#                                              appended later (and reopens the
+#                                              file if it is rotated or truncated)
+#
+# Errors stay the same as open(): FileReader("missing.txt") raises
+# FileNotFoundError (PermissionError, IsADirectoryError, ...) right away, and
+# the file is closed when the with block ends, even after an error.
+#
+# Views are only valid while you hold them: a reused chunk buffer is
+# overwritten by the next chunk, and lines() views must be released (or
+# copied with bytes(view)) before the reader closes: close() raises
+# BufferError while one is still alive. Leaving the with block never raises
+# for that (so it cannot hide an error from inside the block): the mmap is
+# unmapped once its last view is released.
+#
+# Run `python file_reader.py --bench` to compare with read() on a 2 GB file.
+
+import codecs
+import mmap
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+CHUNK_SIZE = 1 << 20   # Bytes per chunk (1 MiB)
+POLL_INTERVAL = 0.1    # Seconds follow() sleeps when no new data has arrived
+
+
+class FileReader:
+    """A binary file read in chunks, as mmap line views, or followed as it grows."""
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = open(path, "rb")  # Raises FileNotFoundError like open()
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._close()  # A break or an error in the block may leave a lines() view alive
+
+    def _close(self):
+        """Like close(), but leaves a mapping with live views to be unmapped when they go."""
+        self._file.close()
+        if self._map is not None:
+            self._unmap()
+
+    def close(self):
+        """Closes the file and its mmap; raises BufferError while a lines() view is alive.
+
+        The file is closed either way; release the views and call close() again
+        to unmap the file.
+        """
+        self._file.close()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                raise BufferError("release (or copy) the lines() views before closing the reader") from None
+            self._map = None
+
+    @property
+    def size(self):
+        return os.fstat(self._file.fileno()).st_size
+
+    def read(self):
+        """The whole file as bytes (what main.py's read_file does)."""
+        self._file.seek(0)
+        return self._file.read()
+
+    # ---------------------
+    # Chunks
+    # ---------------------
+
+    def chunks(self, size=None, reuse=False):
+        """The file from the start in chunks of size bytes (the last may be shorter).
+
+        With reuse, every chunk is a memoryview of the same buffer: nothing is
+        allocated per chunk, but each chunk is overwritten by the next.
+        """
+        size = size or self.chunk_size
+        self._file.seek(0)
+        if not reuse:
+            while chunk := self._file.read(size):
+                yield chunk
+            return
+        buffer = bytearray(size)
+        with memoryview(buffer) as view:
+            while count := self._file.readinto(buffer):
+                yield view[:count]
+
+    def text_chunks(self, encoding="utf-8", errors="strict", size=None):
+        """The file decoded to str, a chunk at a time."""
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        for chunk in self.chunks(size, reuse=True):
+            if text := decoder.decode(chunk):
+                yield text
+        if text := decoder.decode(b"", final=True):
+            yield text
+
+    # ---------------------
+    # Memory-mapped lines
+    # ---------------------
+
+    def lines(self):
+        """Every line (ending b"\\n" included) as a memoryview into an mmap of the file."""
+        size = self.size
+        if self._map is not None and len(self._map) != size:
+            self._unmap()  # The file grew or was truncated since it was mapped
+        if size == 0:
+            return  # mmap cannot map an empty file
+        if self._map is None:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._map
+        with memoryview(data) as view:
+            start, end = 0, len(data)
+            while start < end:
+                newline = data.find(b"\n", start)
+                stop = end if newline < 0 else newline + 1
+                yield view[start:stop]
+                start = stop
+
+    def _unmap(self):
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Views of the mapping are still alive: it is unmapped when the last is released
+        self._map = None
+
+    # ---------------------
+    # Following a growing file
+    # ---------------------
+
+    def follow(self, from_start=False, poll_interval=POLL_INTERVAL, idle_timeout=None, stop=None):
+        """Complete lines (bytes) as they are appended, like `tail -F`.
+
+        Starts at the end of the file (or its start with from_start). Ends when
+        no data arrives for idle_timeout seconds, or when the stop Event is set;
+        otherwise it runs for as long as it is iterated.
+        """
+        self._file.seek(0, os.SEEK_SET if from_start else os.SEEK_END)
+        partial = b""
+        idle = 0.0
+        while stop is None or not stop.is_set():
+            line = self._file.readline()
+            if line:
+                idle = 0.0
+                if line.endswith(b"\n"):
+                    yield partial + line
+                    partial = b""
+                else:
+                    partial += line  # The writer has not finished this line yet
+                continue
+            if self._reopen_if_replaced() or self._file.tell() > self.size:
+                self._file.seek(0)  # Rotated or truncated: read the new contents from the start
+                partial = b""
+                continue
+            if idle_timeout is not None and idle >= idle_timeout:
+                return
+            if stop is not None:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            idle += poll_interval
+
+    def _reopen_if_replaced(self):
+        """Switches to the file now at self.path if it is a different one (log rotation)."""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return False  # Rotated away and not recreated yet: keep the old file
+        opened = os.fstat(self._file.fileno())
+        if (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino):
+            return False
+        replacement = open(self.path, "rb")
+        self._close()
+        self._file = replacement
+        return True
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _write_sample(path, size):
+    """A log-like file of about size bytes (lines of 40-120 bytes)."""
+    block = b"".join(b"%08d INFO request served in %d ms %s\n" % (i, i % 997, b"x" * (i % 81))
+                     for i in range(10_000))
+    with open(path, "wb") as file:
+        for _ in range(max(1, size // len(block))):
+            file.write(block)
+
+
+def _count_read(path):
+    with open(path, "rb") as file:
+        return file.read().count(b"\n")
+
+
+def _count_chunks(path):
+    with FileReader(path) as reader:
+        return sum(chunk.count(b"\n") for chunk in reader.chunks())
+
+
+def _count_chunks_reused(path):
+    with FileReader(path) as reader:
+        return sum(chunk.obj.count(b"\n", 0, len(chunk)) for chunk in reader.chunks(reuse=True))
+
+
+def _count_lines(path):
+    with FileReader(path) as reader:
+        count = 0
+        for line in reader.lines():
+            count += 1
+            line.release()
+        return count
+
+
+def benchmark(size=2 << 30, path=None):
+    """Counting the lines of a size-byte file: read() against FileReader.
+
+    Pass path to use an existing file instead of writing a sample (size is then ignored).
+    """
+    sample = path is None
+    if sample:
+        path = os.path.join(tempfile.gettempdir(), "file_reader_bench.log")
+        _write_sample(path, size)
+    try:
+        print(f"{os.path.getsize(path):,} bytes; peak = peak Python heap (tracemalloc, over the"
+              f" first 1,000,000 lines for mmap lines)")
+        print(f"{'method':>16} {'time':>8} {'peak':>10}")
+        expected = None
+        for label, count, traced in (("read()", _count_read, _count_read),
+                                     ("chunks", _count_chunks, _count_chunks),
+                                     ("chunks (reuse)", _count_chunks_reused, _count_chunks_reused),
+                                     ("mmap lines", _count_lines, _trace_lines)):
+            start = time.perf_counter()
+            lines = count(path)
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            traced(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert expected is None or lines == expected
+            expected = lines
+            print(f"{label:>16} {elapsed:7.2f}s {peak / 2**20:8.1f} MB")
+    finally:
+        if sample:
+            os.remove(path)
+
+
+def _trace_lines(path, limit=1_000_000):
+    """The first limit lines of lines(): tracing every line of a large file takes minutes."""
+    with FileReader(path) as reader:
+        for index, line in enumerate(reader.lines()):
+            line.release()
+            if index == limit:
+                break
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "app.log")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("first line\nsecond line\ncafé\n")
+
+        with FileReader(path, chunk_size=8) as reader:
+            print(list(reader.chunks())[:2])  # [b'first li', b'ne\nsecon']
+            print("".join(reader.text_chunks()).splitlines())  # ['first line', 'second line', 'café']
+            print([bytes(line) for line in reader.lines()][1])  # b'second line\n'
+
+        try:
+            FileReader(os.path.join(folder, "non_existent_file.txt"))
+        except FileNotFoundError as e:
+            print(f"FileNotFoundError: {e.strerror}")  # FileNotFoundError: No such file or directory
+
+        def append_later():
+            time.sleep(0.2)
+            with open(path, "a") as log:
+                log.write("appended ")
+                log.flush()
+                time.sleep(0.1)
+                log.write("later\n")
+
+        writer = threading.Thread(target=append_later)
+        writer.start()
+        with FileReader(path) as reader:
+            print(list(reader.follow(poll_interval=0.05, idle_timeout=1)))  # [b'appended later\n']
+        writer.join()
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -29,7 +29,11 @@ def safe_divide(a, b):
 
 # File handling with try-except-finally
 def read_file(filename):
-    """Tries to read a file and handles FileNotFoundError."""
+    """Tries to read a file and handles FileNotFoundError.
+
+    Reads the whole file into memory; for large files see file_reader.py.
+    """
+    file = None
     try:
         file = open(filename, "r")
         content = file.read()
@@ -38,7 +42,7 @@ def read_file(filename):
         return "Error: File not found!"
     finally:
         print("Closing file (if it was opened).")
-        if "file" in locals():  # Check if file was opened
+        if file is not None:  # open() failed otherwise
             file.close()
 
 
@@ -100,9 +104,10 @@ class UnderageError(Exception):
         super().__init__(self.message)  # Calls Exception's constructor
 
 
-try:
-    age = 16
-    if age < 18:
-        raise UnderageError(age)  # Raising the custom exception
-except UnderageError as e:
-    print(f"Custom Error: {e.message} (Age entered: {e.age})")
+if __name__ == "__main__":
+    try:
+        age = 16
+        if age < 18:
+            raise UnderageError(age)  # Raising the custom exception
+    except UnderageError as e:
+        print(f"Custom Error: {e.message} (Age entered: {e.age})")
@@ -2,7 +2,7 @@ import asyncio
 
 async def task1():
     print("Task 1: Started")
-    asyncio.sleep(5)  # Simulate delay
+    await asyncio.sleep(5)  # Simulate delay
     print("Task 1: Completed")
 
 async def task2():
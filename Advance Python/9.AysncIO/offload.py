@@ -0,0 +1,302 @@
+# Offloading Blocking Work from the Event Loop
+#
+# The coroutines in main.py only sleep, which frees the event loop. Real code
+# also computes (like the cubes and squares in Multiprocessing/main.py) or
+# calls blocking libraries, and while one coroutine does that, *every*
+# coroutine on the loop waits.
+#
+# Offloader lets async code await such functions without blocking the loop:
+#
+#   await off.cpu(cube_sum, 10**6)    - runs in a process pool (own GIL, own core)
+#   await off.io(blocking_read, path) - runs in a thread pool (fine for waiting)
+#   await off.run(func, *args)        - picks one of the two automatically
+#
+# - Batching: tiny CPU calls cost more in pickling and process round trips than
+#   in work, so cpu() collects calls to the same function for up to
+#   BATCH_DELAY seconds (or BATCH_SIZE calls) and sends them as one task.
+# - Routing: run() first calls a function in a thread a few times, measuring
+#   CPU time (time.thread_time) against wall time. Mostly CPU -> processes from
+#   then on; mostly waiting -> threads. The timed calls run one at a time
+#   (threads sharing the GIL would skew the ratio) and further calls wait for
+#   the decision instead of piling onto the threads. Functions that cannot be
+#   pickled (lambdas, closures) always stay on threads.
+# - LagMonitor measures how late the loop wakes up from a short sleep: that
+#   delay is what every other coroutine suffers.
+#
+# Run `python offload.py --bench` for loop lag under CPU load.
+
+import asyncio
+import os
+import pickle
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+BATCH_SIZE = 64         # cpu() calls to one function sent to a process together at most
+BATCH_DELAY = 0.002     # Seconds a cpu() call may wait for others to join its batch
+PROFILE_CALLS = 3       # Thread calls timed before run() decides where a function goes
+CPU_RATIO = 0.5         # CPU time / wall time above which a function counts as CPU-bound
+
+AUTO = "auto"
+CPU = "cpu"
+IO = "io"
+
+
+def _run_batch(func, calls):
+    """Runs func on every argument tuple in a worker; one failure does not sink the batch."""
+    results = []
+    for args in calls:
+        try:
+            results.append((True, func(*args)))
+        except Exception as error:
+            results.append((False, error))
+    return results
+
+
+def _timed(func, args):
+    """func(*args) plus the CPU and wall time it took (runs in a thread)."""
+    cpu, wall = time.thread_time(), time.perf_counter()
+    result = func(*args)
+    return result, time.thread_time() - cpu, time.perf_counter() - wall
+
+
+class Offloader:
+    """Awaitable process and thread pools, with batching and automatic routing."""
+
+    def __init__(self, processes=None, threads=None, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        self._processes = ProcessPoolExecutor(processes or os.cpu_count() or 1)
+        self._threads = ThreadPoolExecutor(threads)
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._pending = {}  # func -> (list of args, list of futures)
+        self._profiles = {}  # func -> [calls, cpu seconds, wall seconds]
+        self._profiling = {}  # func -> Lock held by the one timed call in flight
+        self._routes = {}  # func -> CPU or IO once decided
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.to_thread(self.shutdown)  # Waiting for the pools would block the loop
+
+    def shutdown(self):
+        self._processes.shutdown(wait=True, cancel_futures=True)
+        self._threads.shutdown(wait=True, cancel_futures=True)
+
+    # ---------------------
+    # Explicit routes
+    # ---------------------
+
+    async def io(self, func, *args):
+        """func(*args) in a thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._threads, func, *args)
+
+    async def cpu(self, func, *args):
+        """func(*args) in a worker process, batched with other calls to func."""
+        if self.batch_size <= 1:
+            return await asyncio.get_running_loop().run_in_executor(self._processes, func, *args)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(func)
+        if batch is None:
+            batch = self._pending[func] = ([], [])
+            asyncio.get_running_loop().call_later(self.batch_delay, self._flush, func, batch)
+        batch[0].append(args)
+        batch[1].append(future)
+        if len(batch[0]) >= self.batch_size:
+            self._flush(func, batch)
+        return await future
+
+    def _flush(self, func, batch):
+        if self._pending.get(func) is not batch:
+            return  # Already sent (full before the timer fired)
+        del self._pending[func]
+        calls, futures = batch
+        try:
+            task = asyncio.get_running_loop().run_in_executor(self._processes, _run_batch, func, calls)
+        except Exception as error:  # A broken pool, or shut down before the timer fired
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        task.add_done_callback(lambda done: self._deliver(done, futures))
+
+    @staticmethod
+    def _deliver(done, futures):
+        if done.cancelled() or done.exception() is not None:
+            error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for future, (ok, value) in zip(futures, done.result()):
+            if future.done():
+                continue  # The caller stopped waiting
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    # ---------------------
+    # Automatic routing
+    # ---------------------
+
+    def route(self, func):
+        """CPU, IO, or None while func is still being profiled."""
+        return self._routes.get(func)
+
+    async def run(self, func, *args, kind=AUTO):
+        """func(*args) off the loop: on processes (CPU), threads (IO) or as measured (AUTO)."""
+        if kind == CPU:
+            return await self.cpu(func, *args)
+        if kind == IO:
+            return await self.io(func, *args)
+        route = self._routes.get(func)
+        if route is None:
+            async with self._profiling.setdefault(func, asyncio.Lock()):
+                route = self._routes.get(func)  # Decided while this call waited
+                if route is None:
+                    return await self._profile(func, args)
+        return await (self.cpu(func, *args) if route == CPU else self.io(func, *args))
+
+    async def _profile(self, func, args):
+        """func(*args) in a thread, timed; the PROFILE_CALLS-th call decides the route."""
+        result, cpu, wall = await self.io(_timed, func, args)
+        profile = self._profiles.setdefault(func, [0, 0.0, 0.0])
+        profile[0] += 1
+        profile[1] += cpu
+        profile[2] += wall
+        if profile[0] >= PROFILE_CALLS:
+            self._routes[func] = CPU if profile[1] > CPU_RATIO * profile[2] and _picklable(func) else IO
+            del self._profiles[func], self._profiling[func]
+        return result
+
+    async def map(self, func, iterable, kind=AUTO):
+        """[func(item) for item in iterable], awaited off the loop, results in order."""
+        return await asyncio.gather(*(self.run(func, item, kind=kind) for item in iterable))
+
+
+def _picklable(func):
+    try:
+        pickle.dumps(func)
+        return True
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+
+
+class LagMonitor:
+    """Measures how late the event loop wakes from short sleeps (async context manager)."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.lags = array("d")
+        self._due = None  # When the current sleep should end
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._tick())
+        await asyncio.sleep(0)  # Let the first sleep start
+        return self
+
+    async def __aexit__(self, *exc):
+        late = asyncio.get_running_loop().time() - self._due
+        if late > 0:
+            self.lags.append(late)  # The loop was blocked past the sleep still pending
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - self._due))
+
+    def summary(self):
+        """(max, p99, mean) lag in seconds."""
+        lags = sorted(self.lags)
+        if not lags:
+            return 0.0, 0.0, 0.0
+        return lags[-1], lags[min(len(lags) - 1, len(lags) * 99 // 100)], sum(lags) / len(lags)
+
+
+# =====================
+# Benchmark
+# =====================
+
+def cube_sum(n):
+    """CPU-bound: the sum of the cubes of 0..n-1."""
+    return sum(i * i * i for i in range(n))
+
+
+def square(num):
+    return num * num
+
+
+def blocking_read(delay):
+    """Blocking I/O stand-in: time.sleep would freeze the loop if called directly."""
+    time.sleep(delay)
+    return delay
+
+
+def benchmark(calls=20, size=300_000, small_calls=5_000):
+    """Loop lag while computing cube sums inline, on threads and on processes; then batching."""
+    async def inline():
+        results = []
+        for _ in range(calls):
+            results.append(cube_sum(size))
+            await asyncio.sleep(0)  # Other coroutines only run between calls
+        return results
+
+    async def threads(off):
+        return await off.map(cube_sum, [size] * calls, kind=IO)
+
+    async def processes(off):
+        return await off.map(cube_sum, [size] * calls, kind=CPU)
+
+    async def run():
+        expected = cube_sum(size)
+        print(f"{calls} x cube_sum({size:,}) on {os.cpu_count()} CPU(s), lag sampled every 5 ms")
+        print(f"{'where':>10} {'wall':>8} {'max lag':>9} {'p99 lag':>9}")
+        async with Offloader() as off:
+            await off.cpu(square, 1)  # Start the worker processes before timing
+            for label, work in (("inline", lambda: inline()), ("threads", lambda: threads(off)),
+                                ("processes", lambda: processes(off))):
+                async with LagMonitor() as monitor:
+                    start = time.perf_counter()
+                    results = await work()
+                    elapsed = time.perf_counter() - start
+                assert results == [expected] * calls
+                worst, p99, _ = monitor.summary()
+                print(f"{label:>10} {elapsed:7.2f}s {worst * 1e3:7.1f}ms {p99 * 1e3:7.1f}ms")
+
+        print(f"{small_calls:,} tiny cpu() calls")
+        for batch_size in (1, BATCH_SIZE):
+            async with Offloader(batch_size=batch_size) as off:
+                await off.cpu(square, 1)
+                start = time.perf_counter()
+                results = await asyncio.gather(*(off.cpu(square, i) for i in range(small_calls)))
+                elapsed = time.perf_counter() - start
+            assert results == [i * i for i in range(small_calls)]
+            print(f"{'batch ' + str(batch_size):>10} {small_calls / elapsed:>10,.0f} calls/s")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    async def demo():
+        async with Offloader() as off:
+            print(await off.cpu(cube_sum, 10))  # 2025
+            print(await off.io(blocking_read, 0.01))  # 0.01
+            for _ in range(PROFILE_CALLS):
+                await off.run(cube_sum, 200_000)
+                await off.run(blocking_read, 0.01)
+            print(off.route(cube_sum), off.route(blocking_read))  # cpu io
+            print(await off.map(square, range(5), kind=CPU))  # [0, 1, 4, 9, 16] (one batch)
+
+    asyncio.run(demo())
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,204 @@
+# Async Job Pipeline
+#
+# main.py runs task1() and then task2(): each `await` waits for the previous
+# coroutine, so the program takes the *sum* of the delays. (task1 also called
+# asyncio.sleep(5) without await, which only creates the coroutine and never
+# waits; that is fixed in main.py.)
+#
+# This module runs jobs concurrently, with limits:
+#
+#   fan_out(func, items, limit)  - await func(item) for every item, at most
+#                                  `limit` at a time (an asyncio.Semaphore);
+#                                  results come back in input order
+#
+#   Pipeline([Stage("fetch", fetch, concurrency=1000),
+#             Stage("parse", parse, concurrency=10)]).run(items)
+#       - stages are connected by bounded asyncio.Queues: when a stage falls
+#         behind, its queue fills up and the stage before it waits (backpressure)
+#       - each stage fans out up to `concurrency` calls at once
+#       - outputs of the last stage are returned (in completion order)
+#
+# Both run their tasks in an asyncio.TaskGroup (Python 3.11+): if one job
+# raises, every other job is cancelled and the error comes out as an
+# ExceptionGroup, so no task is left running in the background.
+#
+# Every stage records per-job latency (time inside func) and queue wait;
+# pipeline.report() summarises them.
+#
+# Run `python pipeline.py --bench` for 10,000 simulated I/O jobs.
+
+import asyncio
+import random
+import sys
+import time
+from array import array
+
+QUEUE_SIZE = 1000  # Items waiting between two stages at most
+_DONE = object()   # Sent down a queue after the last item
+PARSE_DELAY = 0.01  # Seconds the benchmark's parse stage waits per job
+
+
+async def fan_out(func, items, limit=100):
+    """[await func(item) for item in items], running at most limit calls at once."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def call(item):
+        async with semaphore:
+            return await func(item)
+
+    async with asyncio.TaskGroup() as group:
+        tasks = [group.create_task(call(item)) for item in items]
+    return [task.result() for task in tasks]
+
+
+class Stage:
+    """One step of a Pipeline: an async function run on each item, concurrency calls at a time."""
+
+    def __init__(self, name, func, concurrency=1):
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.latency = array("d")     # Seconds inside func, per item
+        self.queue_wait = array("d")  # Seconds the item waited in the stage's input queue
+
+    def summary(self):
+        """(items, mean, p50, p99, max latency, mean queue wait), times in seconds."""
+        latency = sorted(self.latency)
+        n = len(latency)
+        if not n:
+            return 0, 0.0, 0.0, 0.0, 0.0, 0.0
+        return (n, sum(latency) / n, latency[n // 2], latency[min(n - 1, n * 99 // 100)],
+                latency[-1], sum(self.queue_wait) / n)
+
+
+class Pipeline:
+    """Stages connected by bounded queues, each fanning out with a semaphore."""
+
+    def __init__(self, stages, queue_size=QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+
+    async def run(self, items):
+        """Feeds items (an iterable or async iterable) through every stage; returns the outputs."""
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        outputs = []
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._produce(items, queues[0]))
+            for index, stage in enumerate(self.stages):
+                following = queues[index + 1] if index + 1 < len(queues) else None
+                group.create_task(self._dispatch(stage, queues[index], following, outputs, group))
+        return outputs
+
+    async def _produce(self, items, queue):
+        if hasattr(items, "__aiter__"):
+            async for item in items:
+                await queue.put((time.perf_counter(), item))
+        else:
+            for item in items:
+                await queue.put((time.perf_counter(), item))
+        await queue.put((0.0, _DONE))
+
+    async def _dispatch(self, stage, source, target, outputs, group):
+        """Starts a job per item, holding one semaphore permit per running job."""
+        semaphore = asyncio.Semaphore(stage.concurrency)
+        while True:
+            queued_at, item = await source.get()
+            if item is _DONE:
+                break
+            await semaphore.acquire()
+            stage.queue_wait.append(time.perf_counter() - queued_at)
+            group.create_task(self._job(stage, item, semaphore, target, outputs))
+        for _ in range(stage.concurrency):  # Holding every permit means every job has finished
+            await semaphore.acquire()
+        if target is not None:
+            await target.put((0.0, _DONE))
+
+    async def _job(self, stage, item, semaphore, target, outputs):
+        try:
+            start = time.perf_counter()
+            result = await stage.func(item)
+            stage.latency.append(time.perf_counter() - start)
+            if target is None:
+                outputs.append(result)
+            else:
+                await target.put((time.perf_counter(), result))
+        finally:
+            semaphore.release()
+
+    def report(self):
+        """A table of per-stage latency metrics (milliseconds)."""
+        lines = [f"{'stage':>8} {'items':>7} {'mean':>8} {'p50':>8} {'p99':>8} {'max':>8} {'queued':>8}"]
+        for stage in self.stages:
+            n, mean, p50, p99, worst, waited = stage.summary()
+            lines.append(f"{stage.name:>8} {n:>7} " + " ".join(
+                f"{value * 1e3:8.1f}" for value in (mean, p50, p99, worst, waited)))
+        return "\n".join(lines)
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _fetch_delay(job):
+    return 0.05 + (job * 7919 % 1000) / 20_000
+
+
+async def fetch(job):
+    """Simulated I/O: waits 50-100 ms, like a network call."""
+    await asyncio.sleep(_fetch_delay(job))
+    return job
+
+
+async def parse(job):
+    await asyncio.sleep(PARSE_DELAY)
+    return job * 2
+
+
+def benchmark(sizes=(100, 1_000, 10_000), limit=50):
+    """Wall time for n jobs through fetch -> parse, against running them one after another.
+
+    Each size runs with every stage limited to `limit` calls at once (the
+    semaphores at work, about sequential / limit) and unlimited (concurrency=n).
+    """
+    print(f"{'jobs':>7} {'concurrency':>12} {'sequential':>11} {'pipeline':>9}")
+    for n in sizes:
+        sequential = sum(map(_fetch_delay, range(n))) + n * PARSE_DELAY
+        for concurrency in sorted({min(limit, n), n}):
+            pipeline = Pipeline([Stage("fetch", fetch, concurrency=concurrency),
+                                 Stage("parse", parse, concurrency=concurrency)])
+            start = time.perf_counter()
+            outputs = asyncio.run(pipeline.run(range(n)))
+            elapsed = time.perf_counter() - start
+            assert sorted(outputs) == [job * 2 for job in range(n)]
+            print(f"{n:>7} {concurrency:>12,} {sequential:>10.1f}s {elapsed:>8.2f}s")
+            if concurrency < n:
+                print(pipeline.report())  # Queue waits only show up when the semaphores bind
+
+
+if __name__ == "__main__":
+    async def demo():
+        print(await fan_out(fetch, [1, 2, 3], limit=2))  # [1, 2, 3]
+
+        pipeline = Pipeline([Stage("fetch", fetch, concurrency=50), Stage("parse", parse, concurrency=5)],
+                            queue_size=10)
+        outputs = await pipeline.run(range(100))
+        print(len(outputs), sum(outputs))  # 100 9900
+        print(pipeline.report())
+
+        async def flaky(job):
+            await asyncio.sleep(random.random() / 100)
+            if job == 13:
+                raise ValueError("job 13 failed")
+            return job
+
+        flaky_stage = Stage("flaky", flaky, concurrency=10)
+        try:
+            await Pipeline([flaky_stage]).run(range(1000))
+        except* ValueError as group:
+            print(group.exceptions[0], "- finished jobs:", len(flaky_stage.latency))
+            # job 13 failed - finished jobs: a dozen or so (the rest were cancelled)
+
+    asyncio.run(demo())
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,219 @@
+# Worker Pool with Chunking and Shared Memory
+#
+# main.py starts one multiprocessing.Process per call (print_square,
+# print_cube) and the results are only printed. Starting a process costs
+# milliseconds, so one process per number is hopeless for 10^7 numbers, and
+# nothing comes back to the caller.
+#
+# WorkerPool keeps a set of worker processes alive and returns results:
+#
+#   pool.map(square, numbers)              - like Pool.map: results pickled back
+#                                            in chunks (one round trip per chunk)
+#   pool.map_range(squares, 0, 10**7)      - results written straight into a
+#   pool.map_array(cubes, values, "d")       multiprocessing.shared_memory block;
+#                                            only a few numbers (the chunk's
+#                                            bounds) are pickled per chunk
+#
+# map_range/map_array take a *chunk kernel*: a function that gets a whole
+# chunk (a range, or a slice of the shared input) and returns its results, so
+# the loop over a chunk runs in C (squares() and cubes() below use map()).
+#
+# Results are stored as an array with a fixed-size typecode. Watch the range:
+# cubes overflow int64 ("q") above 2,097,151, so cubes of 10^7 numbers use "d"
+# (floats, exact up to 2**53 and rounded above).
+#
+# Run `python pool.py --bench` to compare spawn-per-task, Pool.map and shared memory.
+
+import math
+import multiprocessing
+import operator
+import os
+import sys
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+MAX_CHUNK = 1 << 20      # Items per chunk at most (bounds each worker's temporary array)
+CHUNKS_PER_WORKER = 4    # Chunks per worker, so a slow chunk does not hold up the rest
+SPAWN_LIMIT = 500        # Largest n the benchmark runs spawn-per-task on (the rest is extrapolated)
+
+
+def square(num):
+    return num * num
+
+
+def cube(num):
+    return num * num * num
+
+
+def squares(numbers):
+    """Chunk kernel: the square of every number in the chunk."""
+    return map(operator.mul, numbers, numbers)
+
+
+def cubes(numbers):
+    """Chunk kernel: the cube of every number in the chunk."""
+    return map(operator.mul, map(operator.mul, numbers, numbers), numbers)
+
+
+# =====================
+# Worker functions (module level so they can be pickled)
+# =====================
+
+def _call_chunk(func, chunk):
+    return [func(item) for item in chunk]
+
+
+def _shared_chunk(kernel, out_name, out_type, lo, hi, start, in_name, in_type):
+    """Runs kernel on items lo:hi and writes the results into the shared output block."""
+    out = shared_memory.SharedMemory(name=out_name)
+    source = shared_memory.SharedMemory(name=in_name) if in_name is not None else None
+    try:
+        if source is None:
+            results = array(out_type, kernel(range(start + lo, start + hi)))
+        else:
+            with source.buf.cast(in_type) as values:
+                results = array(out_type, kernel(values[lo:hi]))
+        with out.buf.cast(out_type) as view:
+            view[lo:hi] = results
+    finally:
+        out.close()
+        if source is not None:
+            source.close()
+
+
+class WorkerPool:
+    """A reusable process pool that returns results, in chunks or through shared memory."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        # Start the resource tracker before the workers, so they share the parent's.
+        # A worker that starts its own tracker unlinks the parent's blocks when it exits.
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _chunk_bounds(self, n, chunksize=None):
+        if chunksize is None:
+            chunksize = min(MAX_CHUNK, max(1, math.ceil(n / (self.workers * CHUNKS_PER_WORKER))))
+        return [(lo, min(lo + chunksize, n)) for lo in range(0, n, chunksize)]
+
+    def map(self, func, iterable, chunksize=None):
+        """[func(item) for item in iterable], computed by the workers one chunk at a time."""
+        items = iterable if isinstance(iterable, (list, tuple, range)) else list(iterable)
+        chunks = [items[lo:hi] for lo, hi in self._chunk_bounds(len(items), chunksize)]
+        results = []
+        for part in self._pool.imap(_call_chunk_star, [(func, chunk) for chunk in chunks]):
+            results.extend(part)
+        return results
+
+    def _run_shared(self, kernel, n, typecode, start=0, source=None, source_type=None):
+        if n == 0:
+            return array(typecode)
+        itemsize = array(typecode).itemsize
+        out = shared_memory.SharedMemory(create=True, size=n * itemsize)
+        try:
+            in_name = source.name if source is not None else None
+            tasks = [(kernel, out.name, typecode, lo, hi, start, in_name, source_type)
+                     for lo, hi in self._chunk_bounds(n)]
+            self._pool.starmap(_shared_chunk, tasks)
+            results = array(typecode)
+            results.frombytes(out.buf[:n * itemsize])
+            return results
+        finally:
+            out.close()
+            out.unlink()
+
+    def map_range(self, kernel, start, stop, typecode="q"):
+        """kernel applied to range(start, stop), as an array of typecode (via shared memory)."""
+        return self._run_shared(kernel, max(0, stop - start), typecode, start=start)
+
+    def map_array(self, kernel, values, typecode=None):
+        """kernel applied to an array of numbers, as an array of typecode (values' own by default).
+
+        The input is copied into shared memory once; workers read their slice from it.
+        """
+        typecode = typecode or values.typecode
+        if not values:
+            return array(typecode)
+        source = shared_memory.SharedMemory(create=True, size=len(values) * values.itemsize)
+        try:
+            with source.buf.cast(values.typecode) as view:
+                view[:len(values)] = values
+            return self._run_shared(kernel, len(values), typecode,
+                                    source=source, source_type=values.typecode)
+        finally:
+            source.close()
+            source.unlink()
+
+
+def _call_chunk_star(args):
+    return _call_chunk(*args)
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _spawn_per_task(func, numbers):
+    """main.py's approach: one Process per number, results sent back through a Queue."""
+    queue = multiprocessing.Queue()
+    results = []
+    for num in numbers:
+        process = multiprocessing.Process(target=_put_result, args=(queue, func, num))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    return results
+
+
+def _put_result(queue, func, num):
+    queue.put(func(num))
+
+
+def benchmark(n=10_000_000):
+    """Squares (int64) and cubes (float64) of range(n) by each approach."""
+    print(f"{n:,} numbers on {os.cpu_count()} CPU(s); ~ = extrapolated from {SPAWN_LIMIT} tasks")
+    print(f"{'workload':>10} {'spawn/task':>11} {'Pool.map':>10} {'shared mem':>11}")
+    with WorkerPool() as pool, multiprocessing.Pool(pool.workers) as plain:
+        for label, func, kernel, typecode in (("square", square, squares, "q"),
+                                              ("cube", cube, cubes, "d")):
+            start = time.perf_counter()
+            spawned = _spawn_per_task(func, range(SPAWN_LIMIT))
+            spawn = (time.perf_counter() - start) * n / SPAWN_LIMIT
+
+            start = time.perf_counter()
+            expected = plain.map(func, range(n), chunksize=max(1, n // (pool.workers * 4)))
+            mapped = time.perf_counter() - start
+
+            start = time.perf_counter()
+            shared = pool.map_range(kernel, 0, n, typecode)
+            shared_time = time.perf_counter() - start
+
+            assert spawned == expected[:SPAWN_LIMIT]
+            assert shared == array(typecode, expected)
+            print(f"{label:>10} {'~':>1}{spawn:>9.0f}s {mapped:>9.2f}s {shared_time:>10.2f}s")
+            del expected, shared  # Forking with them still alive would slow the next spawn run
+
+
+if __name__ == "__main__":
+    with WorkerPool(2) as pool:
+        print(pool.map(square, [10, 20, 30]))  # Expected: [100, 400, 900]
+        print(pool.map(cube, [10]))  # Expected: [1000]
+        print(pool.map_range(squares, 0, 5).tolist())  # Expected: [0, 1, 4, 9, 16]
+        print(pool.map_array(cubes, array("q", [1, 2, 3])).tolist())  # Expected: [1, 8, 27]
+        print(pool.map_range(cubes, 10**7, 10**7 + 1, "d")[0])  # Expected: 1e+21 (too big for "q")
+
+    if "--bench" in sys.argv:
+        benchmark()
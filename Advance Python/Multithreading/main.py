@@ -27,8 +27,9 @@ def task():
     time.sleep(10)
     print("Task completed!")
 
-t = threading.Thread(target=task)
-t.start()
+if __name__ == "__main__":
+    t = threading.Thread(target=task)
+    t.start()
 
-t.join()  # Main program waits here until 't' finishes
-print("Main thread finished!")
+    t.join()  # Main program waits here until 't' finishes
+    print("Main thread finished!")
@@ -0,0 +1,221 @@
+# Thread-Pool Task Runner
+#
+# main.py starts one threading.Thread per call and join()s each one; the
+# functions print their results, so the caller never gets them back.
+#
+# TaskRunner is a fixed set of worker threads fed from a priority queue:
+#
+#   runner.submit(fn, *args, priority=0, timeout=None) -> Future
+#       - lower priority numbers run first; equal priorities run in submit order
+#       - the Future (concurrent.futures.Future) gives the return value:
+#         future.result(), future.exception(), future.cancel()
+#       - timeout (seconds, counted from submit): a task not finished in time
+#         fails with TimeoutError. A task still queued then never starts; a
+#         running one cannot be stopped (Python threads cannot be killed), but
+#         its late result is dropped.
+#   runner.map(fn, iterable)         -> results in input order
+#   gather(futures)                  -> results of many futures, in order
+#
+# The pool is bounded twice: `workers` threads run tasks, and with max_pending
+# set, submit() blocks while that many tasks are already waiting.
+#
+# Threads help when tasks wait (network, disk, sleep): N tasks that each wait
+# L seconds take about max(L) with enough workers instead of sum(L).
+# Run `python runner.py --bench` to see it.
+
+import heapq
+import itertools
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = float("inf")  # Priority of the shutdown markers: after every real task
+
+
+class TaskRunner:
+    """A bounded thread pool running tasks by priority, returning Futures."""
+
+    def __init__(self, workers=4, max_pending=0):
+        self._queue = queue.PriorityQueue(max_pending)
+        self._order = itertools.count()  # Keeps equal priorities first-in, first-out
+        self._state_lock = threading.Lock()  # Orders worker and timeout updates to a Future
+        self._deadlines = []  # Heap of (deadline, order, future)
+        self._deadline_cond = threading.Condition()
+        self._watchdog = None
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    # ---------------------
+    # Submitting
+    # ---------------------
+
+    def submit(self, fn, *args, priority=0, timeout=None, **kwargs):
+        """Queues fn(*args, **kwargs) and returns its Future."""
+        if self._closed:
+            raise RuntimeError("cannot submit after shutdown")
+        future = Future()
+        order = next(self._order)
+        if timeout is not None:
+            self._add_deadline(time.monotonic() + timeout, order, future)
+        self._queue.put((priority, order, future, fn, args, kwargs))
+        return future
+
+    def map(self, fn, iterable, priority=0, timeout=None):
+        """[fn(item) for item in iterable] on the pool; raises the first task's exception."""
+        return gather([self.submit(fn, item, priority=priority, timeout=timeout)
+                       for item in iterable])
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """Stops the workers after the queued tasks (or cancels those with cancel_pending)."""
+        self._closed = True
+        if cancel_pending:
+            while True:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry[2] is not None:
+                    entry[2].cancel()
+        for _ in self._threads:
+            self._queue.put((_STOP, next(self._order), None, None, None, None))
+        with self._deadline_cond:
+            self._deadline_cond.notify()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    # ---------------------
+    # Workers
+    # ---------------------
+
+    def _work(self):
+        while True:
+            _, _, future, fn, args, kwargs = self._queue.get()
+            if future is None:
+                return
+            with self._state_lock:
+                if future.done() or not future.set_running_or_notify_cancel():
+                    continue  # Cancelled, or timed out while queued
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as error:
+                with self._state_lock:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                with self._state_lock:
+                    if not future.done():  # Otherwise it already timed out
+                        future.set_result(result)
+
+    # ---------------------
+    # Timeouts
+    # ---------------------
+
+    def _add_deadline(self, deadline, order, future):
+        with self._deadline_cond:
+            heapq.heappush(self._deadlines, (deadline, order, future))
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch, daemon=True)
+                self._watchdog.start()
+            elif self._deadlines[0][1] == order:
+                self._deadline_cond.notify()  # New earliest deadline
+
+    def _watch(self):
+        """Fails every future still unfinished at its deadline."""
+        with self._deadline_cond:
+            while not (self._closed and all(f.done() for _, _, f in self._deadlines)):
+                if not self._deadlines:
+                    self._deadline_cond.wait()
+                    continue
+                deadline, _, future = self._deadlines[0]
+                delay = deadline - time.monotonic()
+                if delay > 0 and not future.done():
+                    self._deadline_cond.wait(delay)
+                    continue
+                heapq.heappop(self._deadlines)
+                with self._state_lock:
+                    if not future.done():
+                        future.set_exception(TimeoutError("task did not finish in time"))
+
+
+def gather(futures, return_exceptions=False):
+    """Results of futures in order; exceptions are raised, or returned with return_exceptions."""
+    results = []
+    for future in futures:
+        if return_exceptions:
+            try:
+                results.append(future.result())
+            except BaseException as error:
+                results.append(error)
+        else:
+            results.append(future.result())
+    return results
+
+
+# =====================
+# Benchmark
+# =====================
+
+def cube(num):
+    return num * num * num
+
+
+def square(num):
+    return num * num
+
+
+def fetch(latency):
+    """An I/O-bound task: waits, then returns how long it waited."""
+    time.sleep(latency)
+    return latency
+
+
+def benchmark(n=100, worker_counts=(1, 10, 100)):
+    """n tasks sleeping 10-200 ms each: wall time against sum and max of their latencies."""
+    rng = random.Random(0)
+    latencies = [rng.uniform(0.01, 0.2) for _ in range(n)]
+    print(f"{n} tasks: sum(latency) = {sum(latencies):.2f}s, max(latency) = {max(latencies):.2f}s")
+    print(f"{'workers':>8} {'wall':>8}")
+    for workers in worker_counts:
+        with TaskRunner(workers) as runner:
+            start = time.perf_counter()
+            results = runner.map(fetch, latencies)
+            elapsed = time.perf_counter() - start
+        assert results == latencies
+        print(f"{workers:>8} {elapsed:7.2f}s")
+
+
+if __name__ == "__main__":
+    with TaskRunner(workers=2) as runner:
+        print(runner.map(square, [10, 20, 30]))  # [100, 400, 900]
+        print(runner.submit(cube, 10).result())  # 1000
+
+        slow = runner.submit(fetch, 1.0, timeout=0.1)
+        try:
+            slow.result()
+        except TimeoutError as error:
+            print("TimeoutError:", error)  # TimeoutError: task did not finish in time
+
+    with TaskRunner(workers=1) as runner:
+        blocker = runner.submit(fetch, 0.1)  # Keeps the only worker busy while the rest queue up
+        order = []
+        futures = [runner.submit(order.append, name, priority=priority)
+                   for name, priority in (("low", 5), ("high", 1), ("normal", 3))]
+        dropped = runner.submit(order.append, "cancelled", priority=0)
+        print(dropped.cancel())  # True: it had not started
+        gather(futures)
+        print(order)  # ['high', 'normal', 'low']
+
+    if "--bench" in sys.argv:
+        benchmark()
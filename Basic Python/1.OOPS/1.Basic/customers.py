@@ -0,0 +1,249 @@
+# Compact Customer Records
+#
+# Bank in main.py keeps each customer's name, adhar and phn in a per-object
+# __dict__ (a hash table per customer), and the customer's `name` hides the
+# class attribute `name` that holds the bank's name. With millions of
+# customers the dicts alone cost gigabytes.
+#
+# Two compact replacements with the same behaviour:
+#
+#   Customer      - a __slots__ class: the three fields are stored in fixed
+#                   slots inside the object, no __dict__. The bank's details
+#                   are class attributes called bank_name/addr/branch, so they
+#                   no longer clash with the customer's name (a slot and a class
+#                   attribute cannot share a name).
+#
+#   CustomerTable - no object per customer at all: adhar and phn numbers live in
+#                   array('q') columns and the names in one UTF-8 byte buffer.
+#                   An open-addressing hash index (also an array) finds a
+#                   customer by Aadhaar number in O(1).
+#
+# Run `python customers.py --bench` for bytes per customer with each layout.
+
+import sys
+import time
+import tracemalloc
+from array import array
+
+from main import Bank
+
+
+class Customer:
+    """A bank customer stored in slots (no per-object __dict__)."""
+
+    __slots__ = ("name", "adhar", "phn")
+
+    # Class attributes (shared by every customer)
+    bank_name = 'SBI'
+    addr = 'Noida'
+    branch = 'Sec 16'
+
+    def __init__(self, name, adhar, phn):
+        self.name = name
+        self.adhar = adhar
+        self.phn = phn
+
+    def __repr__(self):
+        return f"Customer({self.name!r}, {self.adhar}, {self.phn})"
+
+    def show_details(self):
+        print(f"Name: {self.name}, Phone Number: {self.phn}")
+
+    def change_no(self, new=None):
+        """Updates the phone number (asks for it when new is not given, like main.py)."""
+        self.phn = int(input("Enter a new number: ")) if new is None else new
+
+    @classmethod
+    def bank_info(cls):
+        print(f"Bank Name: {cls.bank_name}, Branch: {cls.branch}")
+
+    @classmethod
+    def change_branch(cls, new):
+        cls.branch = new
+
+
+# =====================
+# Array-backed table
+# =====================
+
+_EMPTY = -1
+_GOLDEN = 0x9E3779B97F4A7C15  # Spreads nearby Aadhaar numbers over the index
+_MASK64 = (1 << 64) - 1
+
+
+class CustomerTable:
+    """Many customers stored as columns, with an O(1) index by Aadhaar number.
+
+    The bank details and bank_info()/change_branch() are shared with Customer.
+    """
+
+    bank_info = Customer.bank_info
+    change_branch = Customer.change_branch
+
+    def __init__(self, capacity=8):
+        self.adhar = array("q")
+        self.phn = array("q")
+        self._names = bytearray()        # Every name, UTF-8, back to back
+        self._ends = array("Q")          # Where each row's name ends in _names
+        bits = max(3, (2 * capacity - 1).bit_length())
+        self._index = array("q", [_EMPTY]) * (1 << bits)  # Row numbers; kept at most half full
+        self._bits = bits
+
+    def __len__(self):
+        return len(self.adhar)
+
+    def __contains__(self, adhar):
+        return self._find(adhar) != _EMPTY
+
+    # ---------------------
+    # Index
+    # ---------------------
+
+    def _slot(self, adhar):
+        """First index slot to try for adhar (Fibonacci hashing)."""
+        return ((adhar * _GOLDEN) & _MASK64) >> (64 - self._bits)
+
+    def _find(self, adhar):
+        """Row of adhar, or _EMPTY. Probes linearly from its slot."""
+        index = self._index
+        mask = len(index) - 1
+        slot = self._slot(adhar)
+        row = index[slot]
+        while row != _EMPTY:
+            if self.adhar[row] == adhar:
+                return row
+            slot = (slot + 1) & mask
+            row = index[slot]
+        return _EMPTY
+
+    def _insert(self, adhar, row):
+        index = self._index
+        mask = len(index) - 1
+        slot = self._slot(adhar)
+        while index[slot] != _EMPTY:
+            slot = (slot + 1) & mask
+        index[slot] = row
+
+    def _grow(self):
+        self._bits += 1
+        self._index = array("q", [_EMPTY]) * (1 << self._bits)
+        for row, adhar in enumerate(self.adhar):
+            self._insert(adhar, row)
+
+    # ---------------------
+    # Rows
+    # ---------------------
+
+    def add(self, name, adhar, phn):
+        """Adds a customer and returns its row; raises KeyError if adhar is already present."""
+        if self._find(adhar) != _EMPTY:
+            raise KeyError(f"duplicate Aadhaar number {adhar}")
+        row = len(self.adhar)
+        self.adhar.append(adhar)
+        self.phn.append(phn)
+        self._names += name.encode()
+        self._ends.append(len(self._names))
+        if 2 * (row + 1) > len(self._index):
+            self._grow()
+        else:
+            self._insert(adhar, row)
+        return row
+
+    def row(self, adhar):
+        """Row number of the customer with this Aadhaar number; raises KeyError if absent."""
+        row = self._find(adhar)
+        if row == _EMPTY:
+            raise KeyError(adhar)
+        return row
+
+    def name(self, row):
+        start = self._ends[row - 1] if row else 0
+        return self._names[start:self._ends[row]].decode()
+
+    def __getitem__(self, adhar):
+        """The customer as a Customer object (a copy; use change_no() to update the table)."""
+        row = self.row(adhar)
+        return Customer(self.name(row), adhar, self.phn[row])
+
+    def __iter__(self):
+        for row in range(len(self.adhar)):
+            yield Customer(self.name(row), self.adhar[row], self.phn[row])
+
+    def show_details(self, adhar):
+        row = self.row(adhar)
+        print(f"Name: {self.name(row)}, Phone Number: {self.phn[row]}")
+
+    def change_no(self, adhar, new=None):
+        row = self.row(adhar)
+        self.phn[row] = int(input("Enter a new number: ")) if new is None else new
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _traced(build):
+    """Runs build() and returns (result, bytes it left allocated)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+
+def _customers(n):
+    # Realistic sizes: 12-digit Aadhaar and 10-digit phone numbers are not cached small ints
+    return ((f"customer{i}", 100_000_000_000 + i * 7919, 9_000_000_000 + i) for i in range(n))
+
+
+def benchmark(n=200_000, lookups=200_000):
+    """Bytes per customer (including the Aadhaar index) and lookup time for each layout."""
+    layouts = [
+        ("dict (main.Bank)", lambda: {a: Bank(name, a, p) for name, a, p in _customers(n)}),
+        ("slots (Customer)", lambda: {a: Customer(name, a, p) for name, a, p in _customers(n)}),
+    ]
+    print(f"{n:,} customers")
+    print(f"{'layout':>20} {'bytes/customer':>15} {'lookup':>10}")
+    keys = [100_000_000_000 + (i * 31 % n) * 7919 for i in range(lookups)]
+    for label, build in layouts:
+        store, used = _traced(build)
+        start = time.perf_counter()
+        for key in keys:
+            store[key].phn
+        elapsed = time.perf_counter() - start
+        print(f"{label:>20} {used / n:>15.1f} {elapsed / lookups * 1e9:8.0f}ns")
+        del store
+
+    def build_table():
+        table = CustomerTable(n)
+        for name, a, p in _customers(n):
+            table.add(name, a, p)
+        return table
+
+    table, used = _traced(build_table)
+    start = time.perf_counter()
+    for key in keys:
+        table.phn[table.row(key)]
+    elapsed = time.perf_counter() - start
+    print(f"{'CustomerTable':>20} {used / n:>15.1f} {elapsed / lookups * 1e9:8.0f}ns")
+
+
+if __name__ == "__main__":
+    ob1 = Customer('Abhishek', 2422, 12345678)
+    ob1.show_details()  # Name: Abhishek, Phone Number: 12345678
+    print(hasattr(ob1, "__dict__"))  # False
+
+    Customer.bank_info()  # Bank Name: SBI, Branch: Sec 16
+    Customer.change_branch("Sec 52")
+    Customer.bank_info()  # Bank Name: SBI, Branch: Sec 52
+
+    table = CustomerTable()
+    table.add('Abhishek', 2422, 12345678)
+    table.add('Sam', 9911, 87654321)
+    table.change_no(9911, 11112222)
+    table.show_details(9911)  # Name: Sam, Phone Number: 11112222
+    print(table[2422])  # Customer('Abhishek', 2422, 12345678)
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -47,23 +47,24 @@ class Bank:
         """
         print("This is a static method, independent of class and instance variables.")
 
-# Creating an instance of Bank class
-ob1 = Bank('Abhishek', 2422, 12345678)
+if __name__ == "__main__":
+    # Creating an instance of Bank class
+    ob1 = Bank('Abhishek', 2422, 12345678)
 
-# Displaying customer details
-ob1.show_details()
+    # Displaying customer details
+    ob1.show_details()
 
-# Uncomment to modify phone number
-# print('Modify details')
-# ob1.change_no()
-# ob1.show_details()
+    # Uncomment to modify phone number
+    # print('Modify details')
+    # ob1.change_no()
+    # ob1.show_details()
 
-# Displaying bank information
-Bank.bank_info()
+    # Displaying bank information
+    Bank.bank_info()
 
-# Changing branch using class method
-Bank.change_branch("Sec 52")
-Bank.bank_info()
+    # Changing branch using class method
+    Bank.change_branch("Sec 52")
+    Bank.bank_info()
 
-# Calling static method
-Bank.method()
+    # Calling static method
+    Bank.method()
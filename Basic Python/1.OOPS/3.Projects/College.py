@@ -33,8 +33,9 @@ class college(school):
     
     
 
-abhi=college("GMPS",8.5,85,"GMPS",9.5,2021,"AKTU",7,2025)
-abhi.display()
+if __name__ == "__main__":
+    abhi=college("GMPS",8.5,85,"GMPS",9.5,2021,"AKTU",7,2025)
+    abhi.display()
 
 
 
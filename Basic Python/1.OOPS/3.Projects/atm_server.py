@@ -0,0 +1,216 @@
+# Asyncio ATM Server
+#
+# bank.py runs the ATM as a blocking input() loop, so it serves one user at a
+# time. This server puts the same deposit / withdraw / check balance operations
+# (through LedgerATM from ledger.py) behind a TCP or Unix socket, and one event
+# loop serves thousands of connections.
+#
+# Protocol: one request per line, one reply per line, in the same order.
+#   O <account>            -> OK <balance>        open with OPENING_BALANCE
+#   D <account> <amount>   -> OK <balance>        deposit
+#   W <account> <amount>   -> OK <balance>        withdraw
+#   B <account>            -> OK <balance>        check balance
+#   anything that fails    -> ERR <status code> <message>
+# D, W and B on an account that was never opened fail with UNKNOWN_ACCOUNT.
+#
+# - Pipelining: a client may send many requests without waiting; they are
+#   answered in order.
+# - Backpressure: replies are written with `await writer.drain()`, so a client
+#   that does not read its replies stops being served (instead of the server
+#   buffering without limit), and at most MAX_CONNECTIONS clients are handled
+#   at once.
+#
+# Run `python atm_server.py --bench` to start a server and the bundled load
+# generator against it (p50/p99 latency and throughput).
+
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+
+from ledger import INVALID_AMOUNT, OK, STATUS_MESSAGES, UNKNOWN_ACCOUNT, Ledger, LedgerATM
+
+OPENING_BALANCE = 5000
+MAX_CONNECTIONS = 10_000
+MAX_LINE = 1024  # Longest request line accepted
+BACKLOG = 4096  # Pending connections the OS queues before refusing new ones
+
+BAD_REQUEST = 99  # Status code for lines that are not O/D/W/B requests (ledger codes are 0-4)
+_BAD_REQUEST = b"ERR 99 Bad request.\n"
+_ARITY = {b"O": 2, b"D": 3, b"W": 3, b"B": 2}  # Words per request, command included
+
+
+class ATMServer:
+    """Serves LedgerATM operations over a line-based protocol."""
+
+    def __init__(self, ledger=None):
+        self.ledger = ledger if ledger is not None else Ledger()
+        self._atms = {}
+        self._slots = asyncio.Semaphore(MAX_CONNECTIONS)
+        self._clients = set()  # Tasks of the connections being served
+        self.requests = 0
+
+    def _atm(self, account):
+        """The LedgerATM for an open account, or None."""
+        atm = self._atms.get(account)
+        if atm is None and self.ledger.balance(account) is not None:
+            atm = self._atms[account] = LedgerATM(self.ledger, account)  # The account exists: opens nothing
+        return atm
+
+    def handle(self, line):
+        """Runs one request line and returns the reply line (bytes, with newline)."""
+        parts = line.split()
+        if len(parts) < 2 or _ARITY.get(parts[0]) != len(parts):
+            return _BAD_REQUEST
+        try:
+            account = parts[1].decode()
+            amount = float(parts[2]) if len(parts) == 3 else 0.0
+        except (UnicodeDecodeError, ValueError):
+            return _BAD_REQUEST
+        if parts[0] == b"O":
+            status = self.ledger.open_account(account, OPENING_BALANCE)
+            if status != OK:
+                return f"ERR {status} {STATUS_MESSAGES[status]}\n".encode()
+        atm = self._atm(account)
+        if atm is None:
+            status = UNKNOWN_ACCOUNT
+        elif parts[0] in (b"O", b"B"):
+            status = OK
+        elif not math.isfinite(amount):
+            status = INVALID_AMOUNT  # nan/inf would slip past the ledger's amount <= 0 check
+        elif parts[0] == b"D":
+            status = atm.deposit(amount)
+        else:
+            status = atm.withdraw(amount)
+        if status != OK:
+            return f"ERR {status} {STATUS_MESSAGES[status]}\n".encode()
+        return f"OK {atm.check_balance():.2f}\n".encode()
+
+    async def serve_client(self, reader, writer):
+        async with self._slots:
+            self._clients.add(asyncio.current_task())
+            try:
+                while True:
+                    try:
+                        line = await reader.readuntil(b"\n")
+                    except asyncio.IncompleteReadError:
+                        break  # Client closed the connection
+                    except asyncio.LimitOverrunError:
+                        writer.write(_BAD_REQUEST)
+                        break
+                    self.requests += 1
+                    writer.write(self.handle(line))
+                    # Returns at once unless the client has stopped reading and the
+                    # reply buffer is past its high-water mark; then this client waits
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+                self._clients.discard(asyncio.current_task())
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """Starts listening on TCP (host, port) or a Unix socket path; returns the server."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.serve_client, path, limit=MAX_LINE,
+                                                   backlog=BACKLOG)
+        return await asyncio.start_server(self.serve_client, host, port, limit=MAX_LINE,
+                                          backlog=BACKLOG)
+
+    async def stop(self, *listeners):
+        """Stops accepting connections and waits for the connected clients to hang up."""
+        for listener in listeners:
+            listener.close()
+        await asyncio.gather(*self._clients)
+
+
+# =====================
+# Load generator
+# =====================
+
+async def _client(open_connection, account, requests, depth, latencies):
+    """One connection sending requests with up to depth of them in flight."""
+    reader, writer = await open_connection()
+    writer.write(b"O %s\n" % account)
+    reply = await reader.readline()
+    if not reply.startswith((b"OK", b"ERR 4 ")):  # Already open from an earlier run is fine
+        raise RuntimeError(f"unexpected reply {reply!r}")
+    sent_at = []
+    sent = received = 0
+    while received < requests:
+        while sent < requests and sent - received < depth:
+            command = b"D" if sent % 2 == 0 else b"W"
+            writer.write(b"%s %s 10\n" % (command, account))
+            sent_at.append(time.perf_counter())
+            sent += 1
+        await writer.drain()
+        reply = await reader.readline()
+        if not reply.startswith(b"OK"):
+            raise RuntimeError(f"unexpected reply {reply!r}")
+        latencies.append(time.perf_counter() - sent_at[received])
+        received += 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load_test(clients=1000, requests=50, depth=8, host="127.0.0.1", port=None, path=None):
+    """Runs the load generator; returns (throughput per second, p50 seconds, p99 seconds)."""
+    if path is not None:
+        def open_connection():
+            return asyncio.open_unix_connection(path)
+    else:
+        def open_connection():
+            return asyncio.open_connection(host, port)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(open_connection, b"user%d" % i, requests, depth, latencies)
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (len(latencies) / elapsed,
+            latencies[len(latencies) // 2],
+            latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)])
+
+
+def benchmark(total_requests=40_000):
+    """Starts a server and runs the load generator on TCP and on a Unix socket."""
+    async def run():
+        server = ATMServer()
+        tcp = await server.start()
+        port = tcp.sockets[0].getsockname()[1]
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, "atm.sock")
+        unix = await server.start(path=path)
+        print(f"{'transport':>9} {'clients':>8} {'depth':>6} {'req/s':>10} {'p50':>9} {'p99':>9}")
+        for transport, kwargs in (("tcp", {"port": port}), ("unix", {"path": path})):
+            for clients, depth in ((1, 1), (1, 64), (1000, 1), (1000, 8)):
+                rate, p50, p99 = await load_test(clients, total_requests // clients, depth, **kwargs)
+                print(f"{transport:>9} {clients:>8} {depth:>6} {rate:>10,.0f} "
+                      f"{p50 * 1e3:7.2f}ms {p99 * 1e3:7.2f}ms")
+        await server.stop(tcp, unix)
+        os.remove(path)
+        os.rmdir(folder)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    async def demo():
+        server = ATMServer()
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"B abhi\nO abhi\nD abhi 1000\nW abhi 99999\nW abhi 500\nB abhi\n")  # Pipelined
+        for _ in range(6):
+            print((await reader.readline()).decode().strip())
+        # ERR 3 Unknown account. / OK 5000.00 / OK 6000.00 / ERR 2 Insufficient balance. /
+        # OK 5500.00 / OK 5500.00
+        writer.close()
+        await server.stop(listener)
+
+    asyncio.run(demo())
+
+    if "--bench" in sys.argv:
+        benchmark()
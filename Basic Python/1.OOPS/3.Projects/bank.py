@@ -41,37 +41,38 @@ class BankATM(ATM):
         print(f"Your current balance is ₹{self._balance}")
 
 # ATM Simulation
-atm = BankATM(5000)  # Initial balance ₹5000
+if __name__ == "__main__":
+    atm = BankATM(5000)  # Initial balance ₹5000
 
-while True:
-    print("\nATM Menu:")
-    print("1. Deposit")
-    print("2. Withdraw")
-    print("3. Check Balance")
-    print("4. Exit")
+    while True:
+        print("\nATM Menu:")
+        print("1. Deposit")
+        print("2. Withdraw")
+        print("3. Check Balance")
+        print("4. Exit")
     
-    choice = input("Enter your choice: ")
+        choice = input("Enter your choice: ")
     
-    if choice == '1':
-        try:
-            amount = float(input("Enter deposit amount: "))
-            atm.deposit(amount)
-        except ValueError:
-            print("Invalid input. Please enter a numeric value.")
+        if choice == '1':
+            try:
+                amount = float(input("Enter deposit amount: "))
+                atm.deposit(amount)
+            except ValueError:
+                print("Invalid input. Please enter a numeric value.")
     
-    elif choice == '2':
-        try:
-            amount = float(input("Enter withdrawal amount: "))
-            atm.withdraw(amount)
-        except ValueError:
-            print("Invalid input. Please enter a numeric value.")
+        elif choice == '2':
+            try:
+                amount = float(input("Enter withdrawal amount: "))
+                atm.withdraw(amount)
+            except ValueError:
+                print("Invalid input. Please enter a numeric value.")
     
-    elif choice == '3':
-        atm.check_balance()
+        elif choice == '3':
+            atm.check_balance()
     
-    elif choice == '4':
-        print("Thank you for using the ATM. Have a great day!")
-        break
+        elif choice == '4':
+            print("Thank you for using the ATM. Have a great day!")
+            break
     
-    else:
-        print("Invalid choice. Please try again.")
+        else:
+            print("Invalid choice. Please try again.")
@@ -0,0 +1,314 @@
+# Train Seat Booking Engine
+#
+# Confirmation in train.py only holds data: the seat number ("B-34") is typed
+# in by hand, nothing stops two passengers getting the same seat, and every
+# booking carries its own copy of the train's timing and platform.
+#
+# BookingEngine allocates the seats itself:
+#   - seats per (train, date, coach) are a bitmap: one int whose set bits are
+#     the free seats. The lowest free seat is `free & -free`, and booking or
+#     freeing a seat flips one bit.
+#   - a full train goes to a first-come-first-served waitlist; cancelling a
+#     confirmed booking hands its seat to the first waitlisted booking
+#   - each (train, date) is guarded by one lock stripe (like ledger.py), so
+#     many threads can book at once without double-booking a seat
+#   - bookings are rows in array columns (train, date, coach, seat, status,
+#     age, gender) plus a list of names: 18 bytes per booking besides the
+#     name string, instead of an object and its __dict__. Timing and
+#     platform are stored once per train. confirmation(booking) rebuilds a
+#     train.Confirmation object when one is needed.
+#
+# Run `python booking.py --bench` for bookings per second and bytes per booking.
+
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from collections import deque
+
+from train import Confirmation
+
+# Booking status codes
+CONFIRMED = 0
+WAITLISTED = 1
+CANCELLED = 2
+UNKNOWN_TRAIN = 3
+WAITLIST_FULL = 4
+NOT_FOUND = 5
+
+STATUS_MESSAGES = {
+    CONFIRMED: "Seat confirmed.",
+    WAITLISTED: "Train full; added to the waitlist.",
+    CANCELLED: "Booking cancelled.",
+    UNKNOWN_TRAIN: "No such train.",
+    WAITLIST_FULL: "Train and waitlist are full.",
+    NOT_FOUND: "No such booking.",
+}
+
+GENDERS = ("male", "female", "other")
+_NO_SEAT = 0xFFFF
+
+
+def _passenger(name, age, gender):
+    """(name, age, gender code) as the booking columns store them; raises ValueError."""
+    if not isinstance(age, int) or not 0 <= age <= 255:
+        raise ValueError(f"age must be an int from 0 to 255, not {age!r}")
+    try:
+        code = GENDERS.index(gender.lower())
+    except (AttributeError, ValueError):
+        raise ValueError(f"gender must be one of {GENDERS}, not {gender!r}") from None
+    return str(name), age, code
+
+
+class BookingEngine:
+    """Seat bitmaps per train, date and coach, with waitlists and compact booking rows."""
+
+    def __init__(self, waitlist_size=100, stripes=64):
+        self.waitlist_size = waitlist_size
+        self._trains = {}       # train -> (train id, coach names, seats per coach, timing, platform)
+        self._train_names = []
+        self._dates = {}        # date -> date id
+        self._date_names = []
+        self._free = {}         # (train id, date id) -> [free-seat bitmap per coach]
+        self._waiting = {}      # (train id, date id) -> deque of booking rows
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._rows_lock = threading.Lock()  # Appending and updating booking rows
+
+        # One row per booking
+        self.names = []
+        self._age = array("B")
+        self._gender = array("B")
+        self._train = array("H")
+        self._date = array("H")
+        self._coach = array("B")
+        self._seat = array("H")  # _NO_SEAT while waitlisted or cancelled
+        self._status = array("B")
+
+    def add_train(self, train, coaches, timing, platform):
+        """Registers a train; coaches is a {coach name: number of seats} dict."""
+        self._trains[train] = (len(self._train_names), list(coaches), list(coaches.values()),
+                               timing, platform)
+        self._train_names.append(train)
+
+    def _date_id(self, date):
+        date_id = self._dates.get(date)
+        if date_id is None:
+            with self._rows_lock:
+                date_id = self._dates.setdefault(date, len(self._date_names))
+                if date_id == len(self._date_names):
+                    self._date_names.append(date)
+        return date_id
+
+    def _lock_for(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---------------------
+    # Booking
+    # ---------------------
+
+    def book(self, train, date, name, age, gender):
+        """Books one seat; returns (status, booking) with status CONFIRMED, WAITLISTED,
+        UNKNOWN_TRAIN or WAITLIST_FULL (booking is None for the last two).
+
+        Raises ValueError for an age outside 0-255 or a gender not in GENDERS,
+        before any seat is taken.
+        """
+        passenger = _passenger(name, age, gender)
+        info = self._trains.get(train)
+        if info is None:
+            return UNKNOWN_TRAIN, None
+        train_id, _, seats, _, _ = info
+        key = (train_id, self._date_id(date))
+        with self._lock_for(key):
+            free = self._free.get(key)
+            if free is None:
+                free = self._free[key] = [(1 << count) - 1 for count in seats]
+            for coach, bits in enumerate(free):
+                if bits:
+                    low = bits & -bits
+                    free[coach] = bits ^ low
+                    return CONFIRMED, self._add_row(passenger, key, coach, low.bit_length() - 1,
+                                                    CONFIRMED)
+            waiting = self._waiting.setdefault(key, deque())
+            if len(waiting) >= self.waitlist_size:
+                return WAITLIST_FULL, None
+            row = self._add_row(passenger, key, 0, _NO_SEAT, WAITLISTED)
+            waiting.append(row)
+            return WAITLISTED, row
+
+    def _add_row(self, passenger, key, coach, seat, status):
+        name, age, gender = passenger  # Already checked by _passenger: no append can fail
+        with self._rows_lock:
+            row = len(self.names)
+            self.names.append(name)
+            self._age.append(age)
+            self._gender.append(gender)
+            self._train.append(key[0])
+            self._date.append(key[1])
+            self._coach.append(coach)
+            self._seat.append(seat)
+            self._status.append(status)
+        return row
+
+    def cancel(self, booking):
+        """Cancels a booking; a freed seat goes to the first waitlisted booking.
+
+        Returns CANCELLED or NOT_FOUND (unknown or already cancelled).
+        """
+        if not 0 <= booking < len(self.names):
+            return NOT_FOUND
+        key = (self._train[booking], self._date[booking])
+        with self._lock_for(key):
+            status = self._status[booking]
+            if status == CANCELLED:
+                return NOT_FOUND
+            if status == WAITLISTED:
+                self._waiting[key].remove(booking)
+                with self._rows_lock:
+                    self._status[booking] = CANCELLED
+                return CANCELLED
+            coach, seat = self._coach[booking], self._seat[booking]
+            waiting = self._waiting.get(key)
+            with self._rows_lock:
+                self._status[booking] = CANCELLED
+                self._seat[booking] = _NO_SEAT
+                if waiting:
+                    promoted = waiting.popleft()
+                    self._status[promoted] = CONFIRMED
+                    self._coach[promoted] = coach
+                    self._seat[promoted] = seat
+                    return CANCELLED
+            self._free[key][coach] |= 1 << seat
+        return CANCELLED
+
+    # ---------------------
+    # Reading bookings
+    # ---------------------
+
+    def status(self, booking):
+        return self._status[booking]
+
+    def seat_number(self, booking):
+        """Seat label like "B-34", "WL-n" for waitlist position n, or None if cancelled."""
+        status = self._status[booking]
+        if status == CANCELLED:
+            return None
+        key = (self._train[booking], self._date[booking])
+        if status == WAITLISTED:
+            return f"WL-{self._waiting[key].index(booking) + 1}"
+        coaches = self._trains[self._train_names[key[0]]][1]
+        return f"{coaches[self._coach[booking]]}-{self._seat[booking] + 1}"
+
+    def free_seats(self, train, date):
+        info = self._trains[train]
+        free = self._free.get((info[0], self._dates.get(date)))
+        return sum(info[2]) if free is None else sum(bits.bit_count() for bits in free)
+
+    def confirmation(self, booking):
+        """The booking as a train.Confirmation object."""
+        train = self._train_names[self._train[booking]]
+        _, _, _, timing, platform = self._trains[train]
+        return Confirmation(self.names[booking], self._age[booking], GENDERS[self._gender[booking]],
+                            timing, platform, self._date_names[self._date[booking]],
+                            self.seat_number(booking), self._status[booking] == CONFIRMED)
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _client(engine, trains, dates, count, seed, done):
+    rng = random.Random(seed)
+    mine = []
+    for i in range(count):
+        if mine and rng.random() < 0.2:
+            engine.cancel(mine.pop(rng.randrange(len(mine))))
+        else:
+            status, booking = engine.book(rng.choice(trains), rng.choice(dates),
+                                          f"p{seed}-{i}", rng.randint(1, 90), "female")
+            if booking is not None:
+                mine.append(booking)
+    done.append(count)
+
+
+def _check(engine):
+    """No seat is held by two confirmed bookings, and free bitmaps agree with the rows."""
+    taken = set()
+    for row in range(len(engine)):
+        if engine._status[row] == CONFIRMED:
+            seat = (engine._train[row], engine._date[row], engine._coach[row], engine._seat[row])
+            assert seat not in taken, f"double booking {seat}"
+            taken.add(seat)
+    for key, free in engine._free.items():
+        train_id, date_id = key
+        assert not (any(free) and engine._waiting.get(key)), "free seat while others wait"
+        for coach, bits in enumerate(free):
+            for seat in range(bits.bit_length()):
+                if bits >> seat & 1:
+                    assert (train_id, date_id, coach, seat) not in taken
+
+
+def benchmark(requests=200_000, thread_counts=(1, 4, 16), n_trains=20, n_dates=7):
+    """Bookings and cancellations per second across threads, then bytes per booking."""
+    trains = [f"Train {i}" for i in range(n_trains)]
+    dates = [f"{day:02d}/03/2025" for day in range(1, n_dates + 1)]
+    coaches = {f"S{i}": 72 for i in range(1, 9)} | {f"B{i}": 64 for i in range(1, 5)}
+    print(f"{n_trains} trains x {n_dates} days x {sum(coaches.values())} seats, 20% cancellations")
+    print(f"{'threads':>8} {'requests/s':>12} {'waitlisted':>11}")
+    for threads in thread_counts:
+        engine = BookingEngine()
+        for train in trains:
+            engine.add_train(train, coaches, "10:00 AM", "Platform 2")
+        done = []
+        workers = [threading.Thread(target=_client,
+                                    args=(engine, trains, dates, requests // threads, seed, done))
+                   for seed in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        _check(engine)
+        waitlisted = engine._status.count(WAITLISTED)
+        print(f"{threads:>8} {sum(done) / elapsed:>12,.0f} {waitlisted:>11,}")
+
+    n = 200_000
+    tracemalloc.start()
+    objects = [Confirmation(f"p{i}", 30, "male", "10:00 AM", "Platform 2", "22/03/2025", "B-34", True)
+               for i in range(n)]
+    old = tracemalloc.get_traced_memory()[0] / n
+    tracemalloc.stop()
+    del objects
+    engine = BookingEngine()
+    engine.add_train("Train", {f"S{i}": 250 for i in range(200)}, "10:00 AM", "Platform 2")
+    tracemalloc.start()
+    for i in range(n):
+        engine.book("Train", f"{i // 50_000:02d}/03/2025", f"p{i}", 30, "male")
+    new = tracemalloc.get_traced_memory()[0] / n
+    tracemalloc.stop()
+    print(f"bytes per booking: Confirmation objects {old:.0f}, BookingEngine {new:.0f}")
+
+
+if __name__ == "__main__":
+    engine = BookingEngine(waitlist_size=2)
+    engine.add_train("Rajdhani", {"B": 2}, "10:00 AM", "Platform 2")
+
+    status, abhi = engine.book("Rajdhani", "22/03/2025", "Abhi", 23, "male")
+    engine.confirmation(abhi).display()
+    # Abhi 23 male / 10:00 AM Platform 2 22/03/2025 / B-1 True
+
+    engine.book("Rajdhani", "22/03/2025", "Sam", 30, "male")
+    status, riya = engine.book("Rajdhani", "22/03/2025", "Riya", 27, "female")
+    print(STATUS_MESSAGES[status], engine.seat_number(riya))  # Train full; added to the waitlist. WL-1
+
+    print(STATUS_MESSAGES[engine.cancel(abhi)])  # Booking cancelled.
+    print(engine.seat_number(riya), engine.status(riya) == CONFIRMED)  # B-1 True
+
+    if "--bench" in sys.argv:
+        benchmark()
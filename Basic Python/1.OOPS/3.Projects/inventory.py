@@ -0,0 +1,311 @@
+# Library Inventory Engine
+#
+# The library class in library.py keeps the stock in a class-level book_dict
+# that every object changes without locking, stores each member's books in a
+# list (return is an O(n) list.remove), and has no way to find a title except
+# by its exact name.
+#
+# Inventory is the same idea built to scale:
+#   - stock per title, and a *set* of borrowed titles per member (O(1) return)
+#   - checkout()/return_book() are atomic under threads: each holds the lock
+#     stripe of the title, then the stripe of the member (always that order,
+#     so two calls cannot deadlock)
+#   - reservations: checking out a title with no copies left can put the member
+#     in a first-come-first-served queue; a returned copy is then held for the
+#     first member in the queue, and only they can check it out
+#   - every operation returns a status code (OK, OUT_OF_STOCK, ...) like ledger.py
+#
+# TitleIndex is the search side:
+#   - prefix search: titles kept sorted (case-insensitively), bisect finds the
+#     first match, so "pyth" costs O(log n + matches)
+#   - full-text search: an inverted index word -> titles; a query returns the
+#     titles containing every word, intersecting the smallest posting set first
+#
+# Run `python inventory.py --bench` for checkouts per second and lookup latency.
+
+import random
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Status codes
+OK = 0
+UNKNOWN_TITLE = 1
+OUT_OF_STOCK = 2
+RESERVED = 3        # Out of stock; the member is now in the title's queue
+NOT_BORROWED = 4
+ALREADY_BORROWED = 5
+
+STATUS_MESSAGES = {
+    OK: "Success.",
+    UNKNOWN_TITLE: "No such book.",
+    OUT_OF_STOCK: "No copies left.",
+    RESERVED: "No copies left; added to the reservation queue.",
+    NOT_BORROWED: "The member has not borrowed this book.",
+    ALREADY_BORROWED: "The member already has this book.",
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text):
+    return _WORD.findall(text.casefold())
+
+
+class TitleIndex:
+    """Prefix and full-text search over titles."""
+
+    def __init__(self, titles=()):
+        self._sorted = []       # Titles in casefold order
+        self._pending = []      # Added since the last sort
+        self._postings = {}     # word -> set of titles
+        self._lock = threading.Lock()
+        self.add_many(titles)
+
+    def __len__(self):
+        return len(self._sorted) + len(self._pending)
+
+    def add_many(self, titles):
+        with self._lock:
+            postings = self._postings
+            for title in titles:
+                self._pending.append(title)
+                for word in _words(title):
+                    posting = postings.get(word)
+                    if posting is None:
+                        postings[word] = {title}
+                    else:
+                        posting.add(title)
+
+    def add(self, title):
+        self.add_many((title,))
+
+    def _sorted_titles(self):
+        """The sorted list, merging in titles added since the last search."""
+        if self._pending:
+            with self._lock:
+                if self._pending:
+                    # Sort a new list and swap it in, so searches running meanwhile
+                    # keep a complete list; Timsort merges the sorted run cheaply
+                    merged = self._sorted + self._pending
+                    merged.sort(key=str.casefold)
+                    self._sorted = merged
+                    self._pending.clear()
+        return self._sorted
+
+    def prefix(self, prefix, limit=10):
+        """Up to limit titles starting with prefix (case-insensitive), in sorted order."""
+        titles = self._sorted_titles()
+        prefix = prefix.casefold()
+        found = []
+        for i in range(bisect_left(titles, prefix, key=str.casefold), len(titles)):
+            if len(found) == limit or not titles[i].casefold().startswith(prefix):
+                break
+            found.append(titles[i])
+        return found
+
+    def search(self, query, limit=10):
+        """Up to limit titles containing every word of query, in sorted order."""
+        with self._lock:  # Posting sets must not grow while they are intersected
+            postings = [self._postings.get(word, ()) for word in set(_words(query))]
+            if not postings:
+                return []
+            postings.sort(key=len)
+            matches = set(postings[0]).intersection(*postings[1:])
+        return sorted(matches, key=str.casefold)[:limit]
+
+
+class Inventory:
+    """Copies per title, borrowed sets per member and reservation queues, with striped locks."""
+
+    def __init__(self, stock=None, stripes=64):
+        self._stock = {}        # title -> copies on the shelf
+        self._borrowed = {}     # member -> set of titles
+        self._queue = {}        # title -> deque of members waiting
+        self._held = {}         # title -> members a returned copy is being held for
+        self._title_locks = [threading.Lock() for _ in range(stripes)]
+        self._member_locks = [threading.Lock() for _ in range(stripes)]
+        self.index = TitleIndex()
+        if stock:
+            self.add_titles(stock.items())
+
+    def _title_lock(self, title):
+        return self._title_locks[hash(title) % len(self._title_locks)]
+
+    def _member_lock(self, member):
+        return self._member_locks[hash(member) % len(self._member_locks)]
+
+    def add_titles(self, stock):
+        """Adds copies for (title, copies) pairs; new titles are indexed for search."""
+        new = []
+        for title, copies in stock:
+            with self._title_lock(title):
+                if title not in self._stock:
+                    self._stock[title] = 0
+                    new.append(title)
+                self._stock[title] += copies
+                self._serve_queue(title)
+        self.index.add_many(new)
+
+    def _serve_queue(self, title):
+        """Moves shelf copies to members waiting for title (caller holds the title lock)."""
+        queue = self._queue.get(title)
+        while queue and self._stock[title] > 0:
+            self._stock[title] -= 1
+            self._held.setdefault(title, set()).add(queue.popleft())
+
+    def copies(self, title):
+        """Copies of title on the shelf, or None for an unknown title."""
+        return self._stock.get(title)
+
+    def borrowed(self, member):
+        return set(self._borrowed.get(member, ()))
+
+    def waiting(self, title):
+        return list(self._queue.get(title, ()))
+
+    def held_for(self, title):
+        return set(self._held.get(title, ()))
+
+    def checkout(self, member, title, reserve=False):
+        """Lends title to member; returns OK, UNKNOWN_TITLE, ALREADY_BORROWED, OUT_OF_STOCK or RESERVED."""
+        with self._title_lock(title), self._member_lock(member):
+            stock = self._stock.get(title)
+            if stock is None:
+                return UNKNOWN_TITLE
+            books = self._borrowed.setdefault(member, set())
+            if title in books:
+                return ALREADY_BORROWED
+            held = self._held.get(title)
+            if held and member in held:
+                held.discard(member)
+            elif stock > 0:
+                self._stock[title] = stock - 1
+            elif not reserve:
+                return OUT_OF_STOCK
+            else:
+                queue = self._queue.setdefault(title, deque())
+                if member not in queue:
+                    queue.append(member)
+                return RESERVED
+            books.add(title)
+        return OK
+
+    def return_book(self, member, title):
+        """Takes title back from member; returns OK or NOT_BORROWED."""
+        with self._title_lock(title), self._member_lock(member):
+            books = self._borrowed.get(member)
+            if not books or title not in books:
+                return NOT_BORROWED
+            books.discard(title)
+            self._stock[title] += 1
+            self._serve_queue(title)
+        return OK
+
+    def search(self, query, limit=10):
+        return self.index.search(query, limit)
+
+    def prefix(self, prefix, limit=10):
+        return self.index.prefix(prefix, limit)
+
+
+# =====================
+# Benchmark
+# =====================
+
+_SYLLABLES = ["py", "tho", "ja", "va", "se", "ql", "ro", "mi", "ka", "lu",
+              "de", "ne", "ti", "ba", "zo", "re", "su", "fa", "go", "hi"]
+
+
+def _vocabulary(size):
+    words = []
+    for a in _SYLLABLES:
+        for b in _SYLLABLES:
+            for c in _SYLLABLES:
+                words.append(a + b + c)
+    return words[:size]
+
+
+def _titles(n, vocabulary):
+    """n distinct titles of three words (i written in base len(vocabulary))."""
+    v = len(vocabulary)
+    return [f"{vocabulary[i % v]} {vocabulary[i // v % v]} {vocabulary[i // v // v % v]}".title()
+            for i in range(n)]
+
+
+def _borrower(inventory, titles, members, count, seed, done):
+    rng = random.Random(seed)
+    ok = 0
+    for _ in range(count):
+        member = rng.choice(members)
+        title = rng.choice(titles)
+        if inventory.checkout(member, title) == OK:
+            ok += 1
+            inventory.return_book(member, title)
+    done.append(ok)
+
+
+def _latency(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def benchmark(n_titles=1_000_000, transactions=200_000, thread_counts=(1, 4, 16)):
+    """Checkout/return pairs per second and search latency against a linear scan."""
+    vocabulary = _vocabulary(1000)
+    titles = _titles(n_titles, vocabulary)
+    start = time.perf_counter()
+    inventory = Inventory(dict.fromkeys(titles, 3))
+    print(f"{n_titles:,} titles indexed in {time.perf_counter() - start:.1f}s")
+
+    members = [f"member{i}" for i in range(10_000)]
+    print(f"{'threads':>8} {'checkouts/s':>12}")
+    for threads in thread_counts:
+        done = []
+        workers = [threading.Thread(target=_borrower,
+                                    args=(inventory, titles, members, transactions // threads, seed, done))
+                   for seed in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        print(f"{threads:>8} {sum(done) / elapsed:>12,.0f}")
+    assert all(inventory.copies(t) == 3 for t in titles[:1000])
+
+    rng = random.Random(0)
+    prefixes = [rng.choice(vocabulary)[:4] for _ in range(1000)]
+    queries = [" ".join(rng.sample(vocabulary, 2)) for _ in range(1000)]
+    inventory.prefix("")  # Sort the index now rather than inside the first timed lookup
+    folded = [title.casefold() for title in titles]
+    scan_prefix = lambda p: [t for t in folded if t.startswith(p)][:10]
+    scan_words = lambda q: [t for t in folded if all(w in t.split() for w in q.split())][:10]
+    print(f"{'lookup':>8} {'index':>10} {'scan':>10}")
+    print(f"{'prefix':>8} {_latency(inventory.prefix, prefixes) * 1e6:8.1f}us "
+          f"{_latency(scan_prefix, prefixes[:3]) * 1e3:8.1f}ms")
+    print(f"{'words':>8} {_latency(inventory.search, queries) * 1e6:8.1f}us "
+          f"{_latency(scan_words, queries[:3]) * 1e3:8.1f}ms")
+
+
+if __name__ == "__main__":
+    library = Inventory({'python': 20, 'java': 6, 'sql': 10, 'js': 1, 'c++': 8,
+                         'Python Crash Course': 2, 'Fluent Python': 1})
+    print(STATUS_MESSAGES[library.checkout("abhi", "js")])  # Success.
+    print(STATUS_MESSAGES[library.checkout("sam", "js", reserve=True)])
+    # No copies left; added to the reservation queue.
+    library.return_book("abhi", "js")
+    print(library.held_for("js"), library.copies("js"))  # {'sam'} 0: the copy is held for sam
+    print(STATUS_MESSAGES[library.checkout("sam", "js")])  # Success.
+    print(library.borrowed("sam"))  # {'js'}
+
+    print(library.prefix("pyth"))  # ['python', 'Python Crash Course']
+    print(library.search("python"))  # ['Fluent Python', 'python', 'Python Crash Course']
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,297 @@
+# Concurrent Ledger for the ATM Project
+#
+# BankATM in bank.py holds one balance, changes it without any locking and
+# prints after every operation. Behind a multi-threaded front end two
+# withdrawals can both pass the balance check, and print() dominates latency.
+#
+# Ledger holds many accounts and is safe to call from many threads:
+#   - lock striping: accounts are spread over a fixed set of locks (stripes),
+#     so threads working on different accounts rarely wait for each other
+#   - apply_batch(): a list of deposits/withdrawals that is applied all-or-nothing
+#   - every operation returns a status code (OK, INSUFFICIENT_FUNDS, ...) instead
+#     of printing; STATUS_MESSAGES has the same texts bank.py prints
+#
+# An optional journal callable is told about every change just before it is
+# applied, with the account's lock held, so it sees changes in the order they
+# are applied; if it raises, the change is not made (wal.py uses this to write
+# its transaction log).
+#
+# LedgerATM is the ATM (the abstract base from bank.py) for one ledger account,
+# so code written against deposit/withdraw/check_balance keeps working.
+#
+# Run `python ledger.py --bench` for transactions per second at 1, 4 and 16 threads,
+# and `python ledger.py --check` to run batches and consistent copies together.
+
+import random
+import sys
+import threading
+import time
+
+from bank import ATM
+
+# Status codes
+OK = 0
+INVALID_AMOUNT = 1
+INSUFFICIENT_FUNDS = 2
+UNKNOWN_ACCOUNT = 3
+ACCOUNT_EXISTS = 4
+
+STATUS_MESSAGES = {
+    OK: "Success.",
+    INVALID_AMOUNT: "Invalid amount. Please enter a positive number.",
+    INSUFFICIENT_FUNDS: "Insufficient balance.",
+    UNKNOWN_ACCOUNT: "Unknown account.",
+    ACCOUNT_EXISTS: "Account already exists.",
+}
+
+OPEN = "O"
+DEPOSIT = "D"
+WITHDRAW = "W"
+
+
+class Ledger:
+    """Balances for many accounts, guarded by striped locks."""
+
+    def __init__(self, stripes=64, journal=None):
+        self._balances = {}
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._accounts_lock = threading.Lock()  # Only for opening accounts
+        self.journal = journal  # Called as journal([(kind, account, amount), ...]) under the lock, before the change
+
+    def _stripe(self, account):
+        return hash(account) % len(self._stripes)
+
+    def _lock_for(self, account):
+        return self._stripes[self._stripe(account)]
+
+    def open_account(self, account, balance=0):
+        """Creates an account; returns OK, INVALID_AMOUNT or ACCOUNT_EXISTS."""
+        if balance < 0:
+            return INVALID_AMOUNT
+        with self._accounts_lock, self._lock_for(account):
+            if account in self._balances:
+                return ACCOUNT_EXISTS
+            if self.journal is not None:
+                self.journal([(OPEN, account, balance)])
+            self._balances[account] = balance
+        return OK
+
+    def balance(self, account):
+        """Current balance of account, or None if it does not exist."""
+        return self._balances.get(account)
+
+    def accounts(self):
+        return list(self._balances)
+
+    def consistent_copy(self, while_locked=None):
+        """Copy of all balances taken with every lock held (nothing changes mid-copy).
+
+        The stripes are taken in index order, like apply_batch() takes its subset.
+
+        while_locked(), if given, also runs before the locks are released.
+        """
+        with self._accounts_lock:
+            for lock in self._stripes:
+                lock.acquire()
+            try:
+                copy = dict(self._balances)
+                if while_locked is not None:
+                    while_locked()
+                return copy
+            finally:
+                for lock in reversed(self._stripes):
+                    lock.release()
+
+    def deposit(self, account, amount):
+        if amount <= 0:
+            return INVALID_AMOUNT
+        with self._lock_for(account):
+            if account not in self._balances:
+                return UNKNOWN_ACCOUNT
+            if self.journal is not None:
+                self.journal([(DEPOSIT, account, amount)])
+            self._balances[account] += amount
+        return OK
+
+    def withdraw(self, account, amount):
+        if amount <= 0:
+            return INVALID_AMOUNT
+        with self._lock_for(account):
+            balance = self._balances.get(account)
+            if balance is None:
+                return UNKNOWN_ACCOUNT
+            if amount > balance:
+                return INSUFFICIENT_FUNDS
+            if self.journal is not None:
+                self.journal([(WITHDRAW, account, amount)])
+            self._balances[account] = balance - amount
+        return OK
+
+    def apply_batch(self, operations):
+        """Applies (kind, account, amount) operations all-or-nothing.
+
+        kind is DEPOSIT or WITHDRAW. Returns (OK, None) when everything was
+        applied, or (status, index) for the first operation that failed, in
+        which case nothing was applied.
+        """
+        operations = list(operations)  # Read twice below: once for the stripes, once to apply
+        # Take every stripe involved in stripe order, the order consistent_copy() uses too,
+        # so batches and copies cannot deadlock
+        locks = [self._stripes[stripe] for stripe in
+                 sorted({self._stripe(account) for _, account, _ in operations})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            pending = {}  # Balances as they would be after the operations checked so far
+            for index, (kind, account, amount) in enumerate(operations):
+                if amount <= 0 or kind not in (DEPOSIT, WITHDRAW):
+                    return INVALID_AMOUNT, index
+                balance = pending.get(account, self._balances.get(account))
+                if balance is None:
+                    return UNKNOWN_ACCOUNT, index
+                if kind == WITHDRAW:
+                    if amount > balance:
+                        return INSUFFICIENT_FUNDS, index
+                    pending[account] = balance - amount
+                else:
+                    pending[account] = balance + amount
+            if self.journal is not None:
+                self.journal(operations)
+            self._balances.update(pending)
+            return OK, None
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def transfer(self, source, target, amount):
+        """Moves amount from source to target atomically; returns a status code."""
+        return self.apply_batch([(WITHDRAW, source, amount), (DEPOSIT, target, amount)])[0]
+
+
+class LedgerATM(ATM):
+    """The ATM interface from bank.py for one account of a Ledger.
+
+    The balance lives in the ledger, so ATM.__init__ (which stores a local
+    _balance) is not used.
+    """
+
+    def __init__(self, ledger, account, balance=0):
+        self.ledger = ledger
+        self.account = account
+        ledger.open_account(account, balance)
+
+    @property
+    def _balance(self):
+        return self.ledger.balance(self.account)
+
+    def deposit(self, amount):
+        return self.ledger.deposit(self.account, amount)
+
+    def withdraw(self, amount):
+        return self.ledger.withdraw(self.account, amount)
+
+    def check_balance(self):
+        return self._balance
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _worker(ledger, accounts, count, seed, done):
+    rng = random.Random(seed)
+    ok = 0
+    for _ in range(count):
+        account = rng.choice(accounts)
+        if rng.random() < 0.5:
+            status = ledger.deposit(account, rng.randint(1, 500))
+        else:
+            status = ledger.withdraw(account, rng.randint(1, 500))
+        ok += status == OK
+    done.append(ok)
+
+
+def benchmark(thread_counts=(1, 4, 16), transactions=400_000, n_accounts=10_000):
+    """Transactions per second with striped locks and with one global lock (stripes=1)."""
+    print(f"{transactions:,} transactions over {n_accounts:,} accounts")
+    print(f"{'threads':>8} {'striped tps':>14} {'global lock tps':>16}")
+    for threads in thread_counts:
+        cells = []
+        for stripes in (64, 1):
+            ledger = Ledger(stripes)
+            accounts = list(range(n_accounts))
+            for account in accounts:
+                ledger.open_account(account, 1000)
+            done = []
+            workers = [threading.Thread(target=_worker,
+                                        args=(ledger, accounts, transactions // threads, seed, done))
+                       for seed in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            assert all(ledger.balance(a) >= 0 for a in accounts)
+            cells.append(transactions // threads * threads / elapsed)
+        print(f"{threads:>8} {cells[0]:>14,.0f} {cells[1]:>16,.0f}")
+
+
+def check_concurrent_copies(ledger=None, threads=4, seconds=1.0, n_accounts=50):
+    """Runs transfers and batches on several threads while another takes consistent copies.
+
+    Fails if a thread is still blocked at the end (a lock-order deadlock) or if
+    a copy does not hold the total the transfers preserve.
+    """
+    ledger = ledger if ledger is not None else Ledger(stripes=8)
+    for account in range(n_accounts):
+        ledger.open_account(account, 1000)
+    total = 1000 * n_accounts
+    stop = threading.Event()
+    copies = []
+
+    def mover(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            a, b, c = rng.sample(range(n_accounts), 3)
+            if rng.random() < 0.5:
+                ledger.transfer(a, b, rng.randint(1, 50))
+            else:
+                amount = rng.randint(1, 50)
+                ledger.apply_batch([(WITHDRAW, a, amount), (DEPOSIT, b, amount // 2),
+                                    (DEPOSIT, c, amount - amount // 2)])
+
+    def copier():
+        while not stop.is_set():
+            copies.append(sum(ledger.consistent_copy().values()))
+
+    workers = [threading.Thread(target=mover, args=(seed,), daemon=True) for seed in range(threads)]
+    workers.append(threading.Thread(target=copier, daemon=True))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join(timeout=5)
+    assert not any(worker.is_alive() for worker in workers), "threads deadlocked"
+    assert copies and all(copy == total for copy in copies), "a copy saw a half-applied batch"
+    return len(copies)
+
+
+if __name__ == "__main__":
+    ledger = Ledger()
+    atm = LedgerATM(ledger, "abhi", 5000)
+    print(STATUS_MESSAGES[atm.deposit(1000)])  # Success.
+    print(STATUS_MESSAGES[atm.withdraw(10_000)])  # Insufficient balance.
+    print(atm.check_balance())  # 6000
+
+    ledger.open_account("sam", 100)
+    print(ledger.transfer("abhi", "sam", 500), ledger.balance("sam"))  # 0 600
+    print(ledger.apply_batch([(DEPOSIT, "sam", 50), (WITHDRAW, "sam", 1000)]))  # (2, 1): nothing applied
+    print(ledger.balance("sam"))  # 600
+
+    if "--check" in sys.argv:
+        print(check_concurrent_copies() > 0)  # True
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -1,11 +1,11 @@
 class library:
     book_dict={'python':20,'java':6,'sql':10,'js':4,'c++':8}
 
-    def __init__(self,name,phno,sid,book=[]):
+    def __init__(self,name,phno,sid,book=None):
         self.name=name
         self.phno=phno
         self.sid=sid
-        self.book=book
+        self.book=[] if book is None else book  # A default [] would be shared by every member
 
     def disp_obj(self):
         print(self.name,self.phno,self.sid,self.book)
@@ -28,25 +28,26 @@ class library:
         print(cls.book_dict)
 
 
-obj = library('abhi',9218918,1234)
+if __name__ == "__main__":
+    obj = library('abhi',9218918,1234)
 
-while True:
-    print(" 1. return 2.get books 3.display 4.exit 5.For Library Details")
-    val = int(input("enter the value: "))
+    while True:
+        print(" 1. return 2.get books 3.display 4.exit 5.For Library Details")
+        val = int(input("enter the value: "))
 
-    if val == 1:
-        obj.return_books()
+        if val == 1:
+            obj.return_books()
 
-    elif val == 2:
-        obj.get_books()
+        elif val == 2:
+            obj.get_books()
     
-    elif val == 3:
-        obj.disp_obj()
+        elif val == 3:
+            obj.disp_obj()
 
-    elif val == 4:
-        break
+        elif val == 4:
+            break
 
-    else:
-        obj.library_details()
+        else:
+            obj.library_details()
 
     
@@ -0,0 +1,365 @@
+# Bulk Academic Records
+#
+# college in College.py builds one record through three constructors
+# (college -> school -> Highschool), keeps nine fields in a per-object
+# __dict__, and display() calls print() three times per record. A million
+# records means a million dicts and three million print() calls.
+#
+# This module keeps the same nine fields, in the same order as college():
+#   name, grade, percentage     (high school)
+#   nameS, gradeS, YOPS         (school: name, grade, year of passing)
+#   nameC, gradeC, YOPC         (college: name, grade, year of passing)
+# in two compact forms:
+#
+#   CollegeRecord - one flat __slots__ object per record (no inheritance
+#                   chain, no __dict__), with the same display()
+#   RecordTable   - columns: names in lists (repeated institution names share
+#                   one string), grades and percentages in array('d'), and
+#                   years as one byte each (year - 1900) in a bytearray.
+#                   Loaded in batches from CSV or JSON lines.
+#
+# Queries on a table are vectorized: table.mask("percentage", ">", 80) compares
+# a whole column at once and returns a bytearray of 0/1 flags (on a year column
+# that is a single bytes.translate() call, since each year is one byte); masks combine with
+# all_of()/any_of(), and records(mask) / count(mask) / display(mask) use them.
+# display() and the exporters build the text in large blocks and write each block once.
+#
+# Run `python records.py --bench` to compare with college objects.
+
+import csv
+import io
+import json
+import operator
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from contextlib import redirect_stdout
+from itertools import compress, islice, repeat
+
+from College import college
+
+FIELDS = ("name", "grade", "percentage", "nameS", "gradeS", "YOPS", "nameC", "gradeC", "YOPC")
+TEXT_FIELDS = ("name", "nameS", "nameC")
+YEAR_FIELDS = ("YOPS", "YOPC")
+BATCH_SIZE = 65_536  # Rows parsed per batch while loading
+WRITE_BLOCK = 16_384  # Records formatted per write() when exporting
+YEAR_BASE = 1900  # Years are stored as year - YEAR_BASE, so 1900-2155 fit in a byte
+
+_YEARS = range(YEAR_BASE, YEAR_BASE + 256)  # Stored byte -> year
+_YEAR_TEXT = [str(year) for year in _YEARS]  # Stored byte -> year as display() prints it
+
+_OPERATORS = {"<": operator.lt, "<=": operator.le, "==": operator.eq,
+              "!=": operator.ne, ">=": operator.ge, ">": operator.gt}
+
+
+def _fmt(value):
+    """Formats a number the way print() showed it for college (85, not 85.0)."""
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+class CollegeRecord:
+    """A flat, slotted record with the same fields and display() as college."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, name, grade, percentage, nameS, gradeS, YOPS, nameC, gradeC, YOPC):
+        self.name = name
+        self.grade = grade
+        self.percentage = percentage
+        self.nameS = nameS
+        self.gradeS = gradeS
+        self.YOPS = YOPS
+        self.nameC = nameC
+        self.gradeC = gradeC
+        self.YOPC = YOPC
+
+    @classmethod
+    def from_college(cls, record):
+        return cls(*(getattr(record, field) for field in FIELDS))
+
+    def display(self):
+        print(self.name, self.grade, self.percentage)
+        print(self.nameS, self.gradeS, self.YOPS)
+        print(self.nameC, self.gradeC, self.YOPC)
+
+
+# =====================
+# Columnar table
+# =====================
+
+class RecordTable:
+    """College records stored as one column per field."""
+
+    def __init__(self):
+        self.columns = {}
+        for field in FIELDS:
+            if field in TEXT_FIELDS:
+                self.columns[field] = []
+            elif field in YEAR_FIELDS:
+                self.columns[field] = bytearray()
+            else:
+                self.columns[field] = array("d")
+        self._strings = {}  # One shared str per distinct institution name
+
+    def __len__(self):
+        return len(self.columns["name"])
+
+    def __getitem__(self, field):
+        """The values of one field (years decoded from their stored bytes)."""
+        if field in YEAR_FIELDS:
+            return array("H", map(_YEARS.__getitem__, self.columns[field]))
+        return self.columns[field]
+
+    def extend(self, rows):
+        """Appends rows of nine values (strings are converted); used per loaded batch.
+
+        The whole batch is converted before any column grows, so a bad value
+        raises with the table unchanged.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        if any(len(row) != len(FIELDS) for row in rows):
+            raise ValueError(f"every row needs {len(FIELDS)} values")
+        converted = []
+        for field, values in zip(FIELDS, zip(*rows)):
+            if field in TEXT_FIELDS:
+                converted.append(list(map(self._strings.setdefault, values, values)))
+            elif field in YEAR_FIELDS:
+                converted.append(bytearray([int(value) - YEAR_BASE for value in values]))
+            else:
+                converted.append(array("d", map(float, values)))
+        for field, values in zip(FIELDS, converted):
+            self.columns[field].extend(values)
+
+    def append(self, *values):
+        self.extend([values])
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds a table from college or CollegeRecord objects."""
+        table = cls()
+        getters = operator.attrgetter(*FIELDS)
+        records = iter(records)
+        while batch := list(islice(records, BATCH_SIZE)):
+            table.extend(map(getters, batch))
+        return table
+
+    # ---------------------
+    # Loading
+    # ---------------------
+
+    @classmethod
+    def load_csv(cls, path, batch_size=BATCH_SIZE):
+        """Loads a CSV file of the nine fields (a header row with the field names is skipped)."""
+        table = cls()
+        with open(path, newline="") as file:
+            rows = csv.reader(file)
+            first = next(rows, None)
+            if first is not None and tuple(first) != FIELDS:
+                table.extend([first])
+            while batch := list(islice(rows, batch_size)):
+                table.extend(batch)
+        return table
+
+    @classmethod
+    def load_jsonl(cls, path, batch_size=BATCH_SIZE):
+        """Loads a JSON-lines file: one object per line with the nine fields as keys."""
+        table = cls()
+        getters = operator.itemgetter(*FIELDS)
+        with open(path) as file:
+            while lines := list(islice(file, batch_size)):
+                table.extend(getters(json.loads(line)) for line in lines if line.strip())
+        return table
+
+    # ---------------------
+    # Vectorized queries
+    # ---------------------
+
+    def mask(self, field, op, value):
+        """0/1 flag per row for `row.field <op> value`; op is one of < <= == != >= >."""
+        compare = _OPERATORS[op]
+        column = self.columns[field]
+        if field in YEAR_FIELDS:
+            # Answer the comparison once for each of the 256 possible bytes, then map the column
+            return bytearray(column.translate(bytes(map(compare, _YEARS, repeat(value)))))
+        return bytearray(map(compare, column, repeat(value)))
+
+    def between(self, field, low, high):
+        """Flags rows with low <= field <= high."""
+        return all_of(self.mask(field, ">=", low), self.mask(field, "<=", high))
+
+    def count(self, mask):
+        return mask.count(1)
+
+    def rows(self, mask):
+        """Row numbers selected by mask."""
+        return list(compress(range(len(self)), mask))
+
+    def record(self, row):
+        return CollegeRecord(*(self.columns[field][row] + YEAR_BASE if field in YEAR_FIELDS
+                               else self.columns[field][row] for field in FIELDS))
+
+    def records(self, mask=None):
+        """CollegeRecord objects for the rows selected by mask (all rows if None)."""
+        rows = range(len(self)) if mask is None else compress(range(len(self)), mask)
+        return [self.record(row) for row in rows]
+
+    def _selected(self, mask, years=_YEARS):
+        """Per-field value iterators, filtered by mask; stored year bytes are looked up in years."""
+        columns = [map(years.__getitem__, self.columns[field]) if field in YEAR_FIELDS
+                   else self.columns[field] for field in FIELDS]
+        if mask is None:
+            return columns
+        return [compress(column, mask) for column in columns]
+
+    # ---------------------
+    # Buffered output
+    # ---------------------
+
+    def display(self, mask=None, file=None):
+        """Prints the selected records like college.display(), one write() per block of records."""
+        file = sys.stdout if file is None else file
+        name, grade, percentage, nameS, gradeS, YOPS, nameC, gradeC, YOPC = self._selected(mask, _YEAR_TEXT)
+        lines = map("{} {} {}\n{} {} {}\n{} {} {}\n".format,
+                    name, map(_fmt, grade), map(_fmt, percentage),
+                    nameS, map(_fmt, gradeS), YOPS,
+                    nameC, map(_fmt, gradeC), YOPC)
+        while block := "".join(islice(lines, WRITE_BLOCK)):
+            file.write(block)
+
+    def write_csv(self, path, mask=None):
+        """Writes the selected rows as CSV with a header row."""
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            rows = zip(*self._selected(mask))
+            while block := list(islice(rows, WRITE_BLOCK)):
+                writer.writerows(block)
+
+    def write_jsonl(self, path, mask=None):
+        """Writes the selected rows as JSON lines."""
+        with open(path, "w") as file:
+            rows = zip(*self._selected(mask))
+            while block := list(islice(rows, WRITE_BLOCK)):
+                file.write("".join(json.dumps(dict(zip(FIELDS, row))) + "\n" for row in block))
+
+
+def all_of(*masks):
+    """Flags rows selected by every mask (bitwise AND over whole masks at once)."""
+    result = int.from_bytes(masks[0], "little")
+    for mask in masks[1:]:
+        result &= int.from_bytes(mask, "little")
+    return bytearray(result.to_bytes(len(masks[0]), "little"))
+
+
+def any_of(*masks):
+    """Flags rows selected by at least one mask."""
+    result = 0
+    for mask in masks:
+        result |= int.from_bytes(mask, "little")
+    return bytearray(result.to_bytes(len(masks[0]), "little"))
+
+
+# =====================
+# Benchmark
+# =====================
+
+_SCHOOLS = [f"School {i}" for i in range(500)]
+_COLLEGES = ["AKTU", "IIT", "NIT", "DU", "VIT", "BITS", "IIIT", "JNU"]
+
+
+def _sample_rows(n):
+    for i in range(n):
+        yield (_SCHOOLS[i % 500], (i % 50) / 5 + 0.5, 40 + i % 61,
+               _SCHOOLS[i * 7 % 500], (i % 47) / 5 + 0.5, 2015 + i % 10,
+               _COLLEGES[i % 8], (i % 41) / 5 + 2, 2019 + i % 10)
+
+
+def _college_objects(path):
+    """What loading looks like with College.py: one college() per CSV row."""
+    with open(path, newline="") as file:
+        rows = csv.reader(file)
+        next(rows)
+        return [college(a, float(b), float(c), d, float(e), int(f), g, float(h), int(i))
+                for a, b, c, d, e, f, g, h, i in rows]
+
+
+def _measure(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _memory(func):
+    tracemalloc.start()
+    result = func()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def benchmark(n=1_000_000):
+    """Load time, memory, a filter query and display() for college objects vs RecordTable."""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "records.csv")
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        writer.writerows(_sample_rows(n))
+
+    print(f"{n:,} records")
+    print(f"{'step':>22} {'college objects':>16} {'RecordTable':>12}")
+    # The table first: a million live college objects slow the garbage collector for later loads
+    table, new = _measure(lambda: RecordTable.load_csv(path))
+    objects, old = _measure(lambda: _college_objects(path))
+    print(f"{'load CSV':>22} {old:>15.2f}s {new:>11.2f}s")
+
+    small = os.path.join(folder, "small.csv")
+    RecordTable.load_csv(path).write_csv(small, bytearray([1]) * (n // 10) + bytearray(n - n // 10))
+    old = _memory(lambda: _college_objects(small)) / (n // 10)
+    new = _memory(lambda: RecordTable.load_csv(small)) / (n // 10)
+    print(f"{'bytes per record':>22} {old:>16.0f} {new:>12.0f}")
+
+    query = "percentage > 80 and YOPC == 2025"
+    hits_old, old = _measure(lambda: [r for r in objects if r.percentage > 80 and r.YOPC == 2025])
+    mask, new = _measure(lambda: all_of(table.mask("percentage", ">", 80),
+                                        table.mask("YOPC", "==", 2025)))
+    assert len(hits_old) == table.count(mask)
+    print(f"{query:>22} {old * 1e3:>14.0f}ms {new * 1e3:>10.0f}ms")
+
+    sample = objects[:100_000]
+    part = bytearray([1]) * len(sample) + bytearray(n - len(sample))
+    out = io.StringIO()
+    with redirect_stdout(out):
+        _, old = _measure(lambda: [r.display() for r in sample])
+    expected = out.getvalue().count("\n")
+    out = io.StringIO()
+    _, new = _measure(lambda: table.display(part, file=out))
+    assert out.getvalue().count("\n") == expected
+    print(f"{'display 100k':>22} {old * 1e3:>14.0f}ms {new * 1e3:>10.0f}ms")
+
+    os.remove(path)
+    os.remove(small)
+    os.rmdir(folder)
+
+
+if __name__ == "__main__":
+    abhi = CollegeRecord("GMPS", 8.5, 85, "GMPS", 9.5, 2021, "AKTU", 7, 2025)
+    abhi.display()  # Same three lines as College.py
+
+    table = RecordTable()
+    table.append("GMPS", 8.5, 85, "GMPS", 9.5, 2021, "AKTU", 7, 2025)
+    table.append("DPS", 7.0, 72.5, "DPS", 8.0, 2020, "DU", 8.2, 2024)
+    table.append("KV", 9.1, 91, "KV", 9.3, 2022, "IIT", 9.0, 2026)
+    top = all_of(table.mask("percentage", ">=", 80), table.mask("YOPC", "<=", 2025))
+    table.display(top)  # Only abhi's record: GMPS 8.5 85 / GMPS 9.5 2021 / AKTU 7 2025
+    print(table.count(table.between("gradeC", 8, 10)))  # 2
+
+    if "--bench" in sys.argv:
+        benchmark()
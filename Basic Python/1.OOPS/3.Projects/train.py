@@ -33,5 +33,6 @@ class Confirmation(Boarding):
         print(self.seatno,self.confirm)
     
     
-abhi=Confirmation("Abhi",23,"male","10:00 AM","Platform 2","22/03/2025","B-34",True)
-abhi.display()
+if __name__ == "__main__":
+    abhi=Confirmation("Abhi",23,"male","10:00 AM","Platform 2","22/03/2025","B-34",True)
+    abhi.display()
@@ -0,0 +1,455 @@
+# Write-Ahead Log and Snapshots for the Ledger
+#
+# The ATM balances (bank.py, ledger.py) live only in memory, so a restart loses
+# them. Writing every transaction to disk with its own fsync would be durable
+# but slow (an fsync takes milliseconds).
+#
+# DurableLedger keeps a Ledger and records every change in an append-only
+# binary log:
+#   - group commit: records collect in a buffer and a background thread writes
+#     and fsyncs them together when max_delay passes or max_bytes pile up,
+#     so one fsync covers many transactions
+#   - sync=True makes each call wait until its record is on disk (waiting
+#     threads still share fsyncs); sync=False returns at once and may lose at
+#     most the last max_delay seconds in a crash
+#   - snapshot() writes all balances to one compact file and starts a new log
+#     segment; older segments are deleted. snapshot_every=N does it automatically.
+#   - recovery (DurableLedger(directory) on an existing folder) loads the
+#     latest snapshot and replays only the log written after it. A torn record
+#     at the end of the log (a crash mid-write) is detected by its CRC and cut off.
+#
+# Files in the directory:
+#   snapshot.bin          -> balances as of some log sequence number (LSN)
+#   wal-<first LSN>.log   -> log segments, oldest first
+#
+# Note: accounts may be ints or strings, amounts ints (of any size) or floats;
+# both are stored exactly, so recovery gives back the same values and types.
+#
+# Run `python wal.py --bench` to measure commit throughput and recovery time, and
+# `python wal.py --check` to run batches and snapshots together.
+
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from ledger import DEPOSIT, OPEN, OK, WITHDRAW, Ledger, check_concurrent_copies
+
+_RECORD_HEADER = struct.Struct("<II")   # CRC32 of the payload, payload length
+_TX_HEADER = struct.Struct("<QH")       # LSN, number of operations
+_INT_ACCOUNT = struct.Struct("<q")
+_STR_LENGTH = struct.Struct("<H")
+_INT_AMOUNT = struct.Struct("<q")
+_FLOAT_AMOUNT = struct.Struct("<d")
+_SNAPSHOT_HEADER = struct.Struct("<8sQQ")  # magic, LSN, number of accounts
+_SNAPSHOT_MAGIC = b"LEDGSNP2"
+
+
+# =====================
+# Encoding
+# =====================
+
+def _encode_account(account):
+    if isinstance(account, int):
+        return b"i" + _INT_ACCOUNT.pack(account)
+    data = account.encode("utf-8")
+    return b"s" + _STR_LENGTH.pack(len(data)) + data
+
+
+def _decode_account(data, offset):
+    """Returns (account, new offset)."""
+    if data[offset:offset + 1] == b"i":
+        return _INT_ACCOUNT.unpack_from(data, offset + 1)[0], offset + 1 + _INT_ACCOUNT.size
+    (length,) = _STR_LENGTH.unpack_from(data, offset + 1)
+    start = offset + 1 + _STR_LENGTH.size
+    return data[start:start + length].decode("utf-8"), start + length
+
+
+def _encode_amount(amount):
+    """b"i" + 8 bytes for ints that fit, b"n" + length + bytes for larger ones, b"f" + 8 for floats."""
+    if isinstance(amount, int):
+        if -1 << 63 <= amount < 1 << 63:
+            return b"i" + _INT_AMOUNT.pack(amount)
+        data = amount.to_bytes((amount.bit_length() + 8) // 8, "little", signed=True)
+        return b"n" + _STR_LENGTH.pack(len(data)) + data
+    if isinstance(amount, float):
+        return b"f" + _FLOAT_AMOUNT.pack(amount)
+    raise TypeError(f"cannot log amount {amount!r}: only int and float are supported")
+
+
+def _decode_amount(data, offset):
+    """Returns (amount, new offset)."""
+    tag = data[offset:offset + 1]
+    if tag == b"i":
+        return _INT_AMOUNT.unpack_from(data, offset + 1)[0], offset + 1 + _INT_AMOUNT.size
+    if tag == b"f":
+        return _FLOAT_AMOUNT.unpack_from(data, offset + 1)[0], offset + 1 + _FLOAT_AMOUNT.size
+    (length,) = _STR_LENGTH.unpack_from(data, offset + 1)
+    start = offset + 1 + _STR_LENGTH.size
+    return int.from_bytes(data[start:start + length], "little", signed=True), start + length
+
+
+def _encode_record(lsn, operations):
+    parts = [_TX_HEADER.pack(lsn, len(operations))]
+    for kind, account, amount in operations:
+        parts.append(kind.encode())
+        parts.append(_encode_amount(amount))
+        parts.append(_encode_account(account))
+    payload = b"".join(parts)
+    return _RECORD_HEADER.pack(zlib.crc32(payload), len(payload)) + payload
+
+
+def _read_records(path):
+    """Yields (lsn, operations, end offset) for every intact record of a segment."""
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        crc, length = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return  # Torn or corrupt tail: everything after it is ignored
+        lsn, count = _TX_HEADER.unpack_from(payload, 0)
+        position = _TX_HEADER.size
+        operations = []
+        for _ in range(count):
+            kind = payload[position:position + 1].decode()
+            amount, position = _decode_amount(payload, position + 1)
+            account, position = _decode_account(payload, position)
+            operations.append((kind, account, amount))
+        offset = start + length
+        yield lsn, operations, offset
+
+
+# =====================
+# Group-commit log
+# =====================
+
+class GroupCommitLog:
+    """Append-only log whose records are fsynced in groups by a background thread."""
+
+    def __init__(self, directory, next_lsn=1, max_delay=0.005, max_bytes=1 << 20):
+        self.directory = directory
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.fsyncs = 0
+        self._lock = threading.Lock()
+        self._durable = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()  # One writer to the file at a time
+        self._buffer = bytearray()
+        self._next_lsn = next_lsn
+        self._durable_lsn = next_lsn - 1
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = open(self._segment_path(next_lsn), "ab")
+        self._flusher = threading.Thread(target=self._run, daemon=True)
+        self._flusher.start()
+
+    def _segment_path(self, first_lsn):
+        return os.path.join(self.directory, f"wal-{first_lsn:020d}.log")
+
+    @property
+    def last_lsn(self):
+        return self._next_lsn - 1
+
+    def append(self, operations):
+        """Buffers one transaction and returns its LSN (not yet durable).
+
+        Raises (and logs nothing) if an account or amount cannot be encoded.
+        """
+        with self._lock:
+            lsn = self._next_lsn
+            record = _encode_record(lsn, operations)
+            self._next_lsn += 1
+            self._buffer += record
+            if len(self._buffer) >= self.max_bytes:
+                self._wake.set()
+        return lsn
+
+    def wait(self, lsn):
+        """Blocks until the record with this LSN is on disk."""
+        with self._durable:
+            while self._durable_lsn < lsn:
+                self._wake.set()  # Someone is waiting: flush now instead of at the window end
+                self._durable.wait()
+
+    def flush(self):
+        """Writes and fsyncs everything appended so far."""
+        with self._io_lock:
+            with self._lock:
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                upto = self._next_lsn - 1
+            if data:
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.fsyncs += 1
+            with self._durable:
+                self._durable_lsn = max(self._durable_lsn, upto)
+                self._durable.notify_all()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.max_delay)
+            self._wake.clear()
+            self.flush()
+
+    def rotate(self):
+        """Flushes, then starts a new segment at the next LSN; returns that LSN."""
+        self.flush()
+        with self._io_lock:
+            self._file.close()
+            self._file = open(self._segment_path(self._next_lsn), "ab")
+            return self._next_lsn
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        self._file.close()
+
+
+# =====================
+# Durable ledger
+# =====================
+
+class DurableLedger:
+    """A Ledger whose changes survive restarts (snapshot + write-ahead log)."""
+
+    def __init__(self, directory, sync=False, snapshot_every=None, stripes=64,
+                 max_delay=0.005, max_bytes=1 << 20):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sync = sync
+        self.snapshot_every = snapshot_every
+        self.ledger = Ledger(stripes)
+        self.recovered_lsn = self._recover()
+        self.log = GroupCommitLog(directory, self.recovered_lsn + 1, max_delay, max_bytes)
+        self._since_snapshot = 0  # Approximate under threads; it only paces snapshots
+        self._snapshot_lock = threading.Lock()
+        self._local = threading.local()  # LSN of the calling thread's last record
+        self.ledger.journal = self._journal
+
+    # ---------------------
+    # Recovery
+    # ---------------------
+
+    def _segments(self):
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("wal-"))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def _recover(self):
+        """Loads the snapshot, replays newer log records; returns the last LSN seen."""
+        balances = self.ledger._balances
+        lsn = 0
+        snapshot = os.path.join(self.directory, "snapshot.bin")
+        if os.path.exists(snapshot):
+            with open(snapshot, "rb") as file:
+                data = file.read()
+            magic, lsn, count = _SNAPSHOT_HEADER.unpack_from(data, 0)
+            if magic != _SNAPSHOT_MAGIC:
+                raise ValueError(f"{snapshot} is not a ledger snapshot")
+            offset = _SNAPSHOT_HEADER.size
+            for _ in range(count):
+                account, offset = _decode_account(data, offset)
+                balances[account], offset = _decode_amount(data, offset)
+        for path in self._segments():
+            end = 0
+            for record_lsn, operations, end in _read_records(path):
+                if record_lsn <= lsn:
+                    continue  # Already in the snapshot
+                for kind, account, amount in operations:
+                    if kind == OPEN:
+                        balances[account] = amount
+                    elif kind == DEPOSIT:
+                        balances[account] += amount
+                    elif kind == WITHDRAW:
+                        balances[account] -= amount
+                lsn = record_lsn
+            if end < os.path.getsize(path):
+                with open(path, "r+b") as file:
+                    file.truncate(end)  # Drop the torn tail so new records follow intact ones
+        return lsn
+
+    # ---------------------
+    # Logging and snapshots
+    # ---------------------
+
+    def _journal(self, operations):
+        self._local.lsn = self.log.append(operations)  # Runs under the ledger's lock
+
+    def _done(self, status):
+        """Waits for durability (sync mode) and takes a snapshot when one is due."""
+        if status == OK:
+            if self.sync:
+                self.log.wait(self._local.lsn)
+            if self.snapshot_every is not None:
+                self._since_snapshot += 1
+                if self._since_snapshot >= self.snapshot_every:
+                    self.snapshot()
+        return status
+
+    def snapshot(self):
+        """Writes all balances to snapshot.bin and deletes the log they cover."""
+        with self._snapshot_lock:
+            self._since_snapshot = 0
+            rotated = []
+            balances = self.ledger.consistent_copy(lambda: rotated.append(self.log.rotate()))
+            lsn = rotated[0] - 1  # Every record up to here is in balances
+            parts = [_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, lsn, len(balances))]
+            for account, balance in balances.items():
+                parts.append(_encode_account(account))
+                parts.append(_encode_amount(balance))
+            path = os.path.join(self.directory, "snapshot.bin")
+            with open(path + ".tmp", "wb") as file:
+                file.write(b"".join(parts))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(path + ".tmp", path)  # Atomic: a crash leaves the old or the new snapshot
+            for segment in self._segments():
+                if int(os.path.basename(segment)[4:-4]) < rotated[0]:
+                    os.remove(segment)
+            return lsn
+
+    # ---------------------
+    # Ledger operations
+    # ---------------------
+
+    def open_account(self, account, balance=0):
+        return self._done(self.ledger.open_account(account, balance))
+
+    def deposit(self, account, amount):
+        return self._done(self.ledger.deposit(account, amount))
+
+    def withdraw(self, account, amount):
+        return self._done(self.ledger.withdraw(account, amount))
+
+    def apply_batch(self, operations):
+        status, index = self.ledger.apply_batch(operations)
+        return self._done(status), index
+
+    def transfer(self, source, target, amount):
+        return self._done(self.ledger.transfer(source, target, amount))
+
+    def balance(self, account):
+        return self.ledger.balance(account)
+
+    def consistent_copy(self, while_locked=None):
+        return self.ledger.consistent_copy(while_locked)
+
+    def close(self):
+        self.log.close()
+
+
+# =====================
+# Benchmark
+# =====================
+
+def benchmark(transactions=1_000_000, n_accounts=1_000):
+    """Commit throughput (async and sync group commit) and recovery time."""
+    import random
+
+    folder = tempfile.mkdtemp()
+    try:
+        rng = random.Random(1)
+        store = DurableLedger(os.path.join(folder, "async"), snapshot_every=None)
+        for account in range(n_accounts):
+            store.open_account(account, 1000)
+        start = time.perf_counter()
+        for i in range(transactions):
+            if i == transactions * 9 // 10:
+                snapshot_at = time.perf_counter()
+                store.snapshot()
+                snapshot_time = time.perf_counter() - snapshot_at
+            store.deposit(rng.randrange(n_accounts), rng.randint(1, 100))
+        store.close()
+        elapsed = time.perf_counter() - start
+        print(f"async group commit: {transactions:,} tx in {elapsed:.2f}s "
+              f"({transactions / elapsed:,.0f} tx/s, {store.log.fsyncs:,} fsyncs, "
+              f"snapshot {snapshot_time * 1e3:.1f}ms)")
+
+        start = time.perf_counter()
+        recovered = DurableLedger(os.path.join(folder, "async"))
+        print(f"recovery (snapshot + 10% tail): {time.perf_counter() - start:.2f}s, "
+              f"last LSN {recovered.recovered_lsn:,}, "
+              f"same balances: {recovered.ledger._balances == store.ledger._balances}")
+        recovered.close()
+
+        # The same log without any snapshot: recovery has to replay all of it
+        store = DurableLedger(os.path.join(folder, "no-snapshot"))
+        for account in range(n_accounts):
+            store.open_account(account, 1000)
+        for _ in range(transactions):
+            store.deposit(rng.randrange(n_accounts), rng.randint(1, 100))
+        store.close()
+        start = time.perf_counter()
+        DurableLedger(os.path.join(folder, "no-snapshot")).close()
+        print(f"recovery (full log replay):     {time.perf_counter() - start:.2f}s")
+
+        sync_tx, threads = 20_000, 16
+        store = DurableLedger(os.path.join(folder, "sync"), sync=True)
+        for account in range(n_accounts):
+            store.ledger.open_account(account, 1000)
+
+        def worker(seed):
+            local = random.Random(seed)
+            for _ in range(sync_tx // threads):
+                store.deposit(local.randrange(n_accounts), 1)
+
+        workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        store.close()
+        print(f"sync group commit, {threads} threads: {sync_tx:,} tx in {elapsed:.2f}s "
+              f"({sync_tx / elapsed:,.0f} tx/s, {store.log.fsyncs:,} fsyncs)")
+    finally:
+        shutil.rmtree(folder)
+
+
+def check_concurrent_snapshots(seconds=1.0):
+    """ledger.check_concurrent_copies on a DurableLedger taking a snapshot every 200 changes,
+    then a restart that must recover the same balances."""
+    folder = tempfile.mkdtemp()
+    try:
+        store = DurableLedger(folder, snapshot_every=200, stripes=8)
+        copies = check_concurrent_copies(store, seconds=seconds)
+        store.close()
+        restarted = DurableLedger(folder)
+        same = restarted.ledger._balances == store.ledger._balances
+        restarted.close()
+        assert same, "recovered balances differ"
+        return copies
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp()
+    store = DurableLedger(folder, sync=True)
+    store.open_account("abhi", 5000)
+    store.deposit("abhi", 1000)
+    store.snapshot()
+    store.withdraw("abhi", 500)
+    store.close()
+
+    restarted = DurableLedger(folder)  # Snapshot (6000) + replay of the withdrawal
+    print(restarted.balance("abhi"))  # Expected: 5500.0
+    restarted.close()
+    shutil.rmtree(folder)
+
+    if "--check" in sys.argv:
+        print(check_concurrent_snapshots() > 0)  # True
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,114 @@
+# Linear-time String Concatenation
+#
+# advance.py joins words with reduce():
+#   reduce(lambda x, y: x + ' ' + y, string_list)
+#   reduce(lambda x, y: x + y, words)
+# Strings are immutable, so every step copies the whole result built so far.
+# For n words that is 1 + 2 + ... + n copies -> O(n^2) time.
+#
+# concat() reads the words once, joins them in batches with str.join() and
+# either returns the result or writes each batch straight into a sink
+# (io.StringIO, an open file, sys.stdout, ...). Time and memory stay linear,
+# and with a sink only one batch is held in memory.
+#
+#   concat(words)                        -> "".join(words)
+#   concat(words, sep=" ")               -> same as the reduce(x + ' ' + y) example
+#   concat(words, reverse_each=True)     -> same as reverse_concat in advance.py
+#   concat(words, sep=" ", sink=file)    -> streams into file, returns chars written
+#
+# Run `python concat.py --bench` to compare with the reduce versions.
+
+import io
+import sys
+import time
+from functools import reduce
+from itertools import islice
+
+BATCH_SIZE = 4096  # Words joined per write to the sink
+
+
+def concat(words, sep="", reverse_each=False, sink=None, batch_size=BATCH_SIZE):
+    """Joins words with sep in linear time.
+
+    words can be any iterable, including a generator reading from a file.
+    With a sink, batches are written to it and the number of characters
+    written is returned; without one, the joined string is returned.
+    """
+    words = iter(words)
+    if reverse_each:
+        words = (word[::-1] for word in words)
+    if sink is None:
+        return sep.join(words)  # join() sizes the result once, then copies each word once
+
+    written = 0
+    first = True
+    while True:
+        batch = list(islice(words, batch_size))
+        if not batch:
+            return written
+        piece = sep.join(batch)
+        if not first:
+            piece = sep + piece  # The separator between this batch and the last one
+        sink.write(piece)
+        written += len(piece)
+        first = False
+
+
+def concat_words(words, sink=None):
+    """Space-separated, like reduce(lambda x, y: x + ' ' + y, words)."""
+    return concat(words, " ", sink=sink)
+
+
+def reverse_concat(words, sink=None):
+    """Each word reversed, then glued together (advance.py's reverse_concat)."""
+    return concat(words, reverse_each=True, sink=sink)
+
+
+# =====================
+# Benchmark
+# =====================
+
+REDUCE_LIMIT = 100_000  # Past this, reduce() (quadratic) is estimated from the last size instead of run
+
+
+def _time(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def benchmark(sizes=(10**4, 10**5, 10**6)):
+    """Times reduce() against concat() for each size (returning and streaming).
+
+    Estimated reduce() times (n^2 scaling from the last measured size) are marked with "~".
+    """
+    print(f"{'words':>10} {'reduce sep':>11} {'reduce':>11} {'concat sep':>11} "
+          f"{'concat':>11} {'StringIO':>11}")
+    measured = None  # (n, [reduce sep, reduce]) of the largest size actually run
+    for n in sizes:
+        words = [f"word{i % 1000}" for i in range(n)]
+        if n <= REDUCE_LIMIT:
+            old = [_time(lambda: reduce(lambda x, y: x + ' ' + y, words)),
+                   _time(lambda: reduce(lambda x, y: x + y, words))]
+            measured = (n, old)
+            old_cells = [f"{c * 1e3:9.1f}ms" for c in old]
+        else:
+            last_n, last = measured
+            old_cells = [f"{'~%.0fs' % (c * (n / last_n) ** 2):>11}" for c in last]
+        new = [_time(lambda: concat(words, " ")),
+               _time(lambda: concat(words)),
+               _time(lambda: concat(words, " ", sink=io.StringIO()))]
+        print(f"{n:>10,} " + " ".join(old_cells + [f"{c * 1e3:9.1f}ms" for c in new]))
+
+
+if __name__ == "__main__":
+    print(concat_words(["Lambda", "functions", "are", "powerful"]))  # Expected: "Lambda functions are powerful"
+    print(concat(["Hello", " ", "World", "!", " Python", " is", " fun"]))  # Expected: "Hello World! Python is fun"
+    print(reverse_concat(["hello", "world", "python"]))  # Expected: "ollehdlrownohtyp"
+
+    buffer = io.StringIO()
+    concat((str(i) for i in range(10)), sep=",", sink=buffer, batch_size=3)
+    print(buffer.getvalue())  # Expected: "0,1,2,3,4,5,6,7,8,9"
+
+    if "--bench" in sys.argv:
+        benchmark()
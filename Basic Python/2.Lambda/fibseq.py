@@ -0,0 +1,165 @@
+# Lazy Fibonacci Sequence
+#
+# advance.py builds the sequence with
+#   reduce(lambda x, _: x + [x[-1] + x[-2]], range(n-2), [0, 1])
+# and x + [...] copies the whole list on every step, so n terms cost O(n^2).
+#
+# FibonacciSequence computes terms only when they are asked for:
+#   - iterating yields terms one by one (a generator, nothing is stored)
+#   - seq[i] and seq[a:b:c] work like a list, backed by a cache of computed terms
+#   - cache_size=k keeps only the most recent cached terms (between k and 2k of
+#     them, trimmed in batches), so memory stays bounded
+#   - mod=p returns every term modulo p, so even seq[10**18] is cheap
+# Indexes far away from the cache are computed directly with fast doubling in
+# O(log i) steps instead of walking up to them; a jump ahead also moves the
+# cache there, so the terms after it cost one addition each.
+#
+# fib_sequence(n) returns a FibonacciSequence with the same terms as the list
+# from advance.py, and it compares equal to that list.
+
+import sys
+import time
+from functools import reduce
+
+_JUMP = 64  # Further than this past the cache, use fast doubling instead of stepping
+
+
+def _fib_pair(n, mod=None):
+    """(F(n), F(n + 1)) by fast doubling, optionally modulo mod."""
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if mod is not None:
+            c, d = c % mod, d % mod
+        a, b = (d, c + d) if bit == "1" else (c, d)
+        if mod is not None:
+            b %= mod
+    return a, b
+
+
+class FibonacciSequence:
+    """Fibonacci numbers F(0), F(1), ... computed on demand.
+
+    length=None makes the sequence unbounded (len() is then undefined, and
+    negative indexes are not allowed).
+    """
+
+    def __init__(self, length=None, cache_size=None, mod=None):
+        if cache_size is not None and cache_size < 2:
+            raise ValueError("cache_size must be at least 2")
+        self.length = length
+        self.cache_size = cache_size
+        self.mod = mod
+        self._start = 0  # Index of the first cached term
+        self._cache = [0, 1 % mod if mod is not None else 1]  # Terms _start, _start + 1, ...
+
+    def _term(self, i):
+        stop = self._start + len(self._cache)
+        if self._start <= i < stop:
+            return self._cache[i - self._start]
+        if i < self._start:
+            return _fib_pair(i, self.mod)[0]  # Behind the cache: jump straight there
+        if i - stop > _JUMP:
+            # Far ahead: move the cache window to i with fast doubling, so the
+            # following terms (a slice, say) are single additions again
+            self._start, self._cache = i, list(_fib_pair(i, self.mod))
+            return self._cache[0]
+        self._extend(i + 1)
+        return self._cache[i - self._start]
+
+    def _extend(self, stop):
+        """Grows the cache until it covers every index below stop."""
+        cache, mod = self._cache, self.mod
+        while self._start + len(cache) < stop:
+            term = cache[-1] + cache[-2]
+            cache.append(term % mod if mod is not None else term)
+        if self.cache_size is not None and len(cache) >= 2 * self.cache_size:
+            drop = len(cache) - self.cache_size  # Trim in batches so it stays O(1) per term
+            del cache[:drop]
+            self._start += drop
+
+    def __len__(self):
+        if self.length is None:
+            raise TypeError("an unbounded FibonacciSequence has no len()")
+        return self.length
+
+    def __iter__(self):
+        a, b = 0, 1
+        i = 0
+        while self.length is None or i < self.length:
+            yield a
+            a, b = b, a + b
+            if self.mod is not None:
+                a, b = a % self.mod, b % self.mod
+            i += 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if self.length is None:
+                if (index.start or 0) < 0 or index.stop is None or index.stop < 0:
+                    raise ValueError("slices of an unbounded sequence need a non-negative stop")
+                indexes = range(index.start or 0, index.stop, index.step or 1)
+            else:
+                indexes = range(*index.indices(self.length))
+            if indexes.step < 0:  # Compute upwards from the cache, then reverse
+                return [self._term(i) for i in reversed(indexes)][::-1]
+            return [self._term(i) for i in indexes]
+        if index < 0:
+            if self.length is None:
+                raise IndexError("negative index on an unbounded FibonacciSequence")
+            index += self.length
+        if index < 0 or (self.length is not None and index >= self.length):
+            raise IndexError("FibonacciSequence index out of range")
+        return self._term(index)
+
+    def __eq__(self, other):
+        if isinstance(other, FibonacciSequence):
+            return (self.length, self.mod) == (other.length, other.mod)
+        if isinstance(other, (list, tuple)) and self.length is not None:
+            return self.length == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        if self.length is not None and self.length <= 20:
+            return repr(list(self))
+        return f"FibonacciSequence(length={self.length}, cache_size={self.cache_size}, mod={self.mod})"
+
+
+def fib_sequence(n, cache_size=None, mod=None):
+    """Lazy drop-in for advance.py's fib_sequence(n) (which always has at least 2 terms)."""
+    return FibonacciSequence(max(n, 2), cache_size, mod)
+
+
+# =====================
+# Benchmark
+# =====================
+
+def benchmark(sizes=(1_000, 10_000, 50_000)):
+    """Times advance.py's reduce version against building the lazy sequence."""
+    print(f"{'n':>8} {'reduce':>10} {'list(lazy)':>11} {'lazy[-1]':>10}")
+    for n in sizes:
+        start = time.perf_counter()
+        reduce(lambda x, _: x + [x[-1] + x[-2]], range(n - 2), [0, 1])
+        old = time.perf_counter() - start
+        start = time.perf_counter()
+        list(fib_sequence(n))
+        lazy_list = time.perf_counter() - start
+        start = time.perf_counter()
+        fib_sequence(n)[-1]
+        last = time.perf_counter() - start
+        print(f"{n:>8,} {old * 1e3:8.1f}ms {lazy_list * 1e3:9.1f}ms {last * 1e3:8.3f}ms")
+
+
+if __name__ == "__main__":
+    seq = fib_sequence(10)
+    print(seq)  # Expected: [0, 1, 1, 2, 3, 5, 8, 13, 21, 34]
+    print(seq == [0, 1, 1, 2, 3, 5, 8, 13, 21, 34])  # Expected: True
+    print(seq[-1], seq[2:6])  # Expected: 34 [1, 2, 3, 5]
+
+    endless = FibonacciSequence(cache_size=100)
+    print(endless[1000] % 1000)  # Expected: 875
+    print(FibonacciSequence(mod=10**9 + 7)[10**18])  # Fast doubling, no huge numbers
+
+    if "--bench" in sys.argv:
+        benchmark()
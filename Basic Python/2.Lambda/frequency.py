@@ -0,0 +1,321 @@
+# Streaming Frequency Counting and Grouping
+#
+# advance.py answers two questions with whole-data tools:
+#   most_frequent_char -> max(Counter(s).items(), key=...)  (all of s in memory)
+#   word grouping      -> words.sort() then groupby()       (O(n log n), all words in memory)
+#
+# This module does the same work on streams:
+#   FrequencyCounter  -> exact counts, fed chunk by chunk, mergeable with other
+#                        counters (e.g. partial results from worker processes)
+#   SpaceSaving       -> approximate heavy hitters in fixed memory (k slots):
+#                        every item seen more than n / k times is kept, and each
+#                        count is off by at most the reported error
+#   group_by()        -> hash-based grouping in one pass, no sort needed
+#
+# For files too large to load, iter_chunks()/iter_words() read a file piece by
+# piece, and count_words_parallel() splits one file into byte ranges, counts
+# each range in a worker process and merges the partial counters.
+#
+# Run `python frequency.py --bench` to compare with the sort + groupby approach.
+
+import codecs
+import heapq
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+CHUNK_SIZE = 1 << 20  # Characters (or bytes) read per chunk
+
+
+# =====================
+# 1. Exact counting
+# =====================
+
+class FrequencyCounter:
+    """Exact item counts built up chunk by chunk."""
+
+    def __init__(self, items=None):
+        self.counts = Counter()
+        if items is not None:
+            self.update(items)
+
+    def update(self, items):
+        """Counts every item (every character, if items is a string)."""
+        self.counts.update(items)
+
+    def merge(self, other):
+        """Adds the counts of another FrequencyCounter (or Counter) into this one."""
+        self.counts.update(other.counts if isinstance(other, FrequencyCounter) else other)
+        return self
+
+    def most_common(self, k=None):
+        """The k most frequent (item, count) pairs; ties keep first-seen order."""
+        if k is None:
+            return self.counts.most_common()
+        return heapq.nlargest(k, self.counts.items(), key=lambda x: x[1])
+
+    def __len__(self):
+        return len(self.counts)
+
+
+def merge_counters(counters):
+    """Merges partial FrequencyCounters (for example, one per worker process)."""
+    total = FrequencyCounter()
+    for counter in counters:
+        total.merge(counter)
+    return total
+
+
+def most_frequent_char(chunks):
+    """Most frequent character of a string, or of an iterable of string chunks."""
+    counter = FrequencyCounter()
+    for chunk in ([chunks] if isinstance(chunks, str) else chunks):
+        counter.update(chunk)
+    return counter.most_common(1)[0][0]
+
+
+# =====================
+# 2. Approximate heavy hitters (Space-Saving)
+# =====================
+
+class SpaceSaving:
+    """Top-k heavy hitters in O(k) memory (Metwally et al., "Space-Saving").
+
+    When a new item arrives and all k slots are taken, it replaces the item with
+    the smallest count and inherits that count as its possible error.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.counts = {}  # item -> estimated count (never lower than the true count)
+        self.errors = {}  # item -> how much the estimate may be over the true count
+        self._heap = []   # (count, item) entries, some stale; used to find the minimum
+
+    def update(self, items, weight=1):
+        """Counts each item weight times."""
+        for item in items:
+            self.add(item, weight)
+
+    def add(self, item, weight=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += weight  # Its heap entry is now stale; _pop_min() fixes that lazily
+            return
+        if len(counts) < self.k:
+            counts[item] = weight
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (weight, item))
+            return
+        smallest, evicted = self._pop_min()
+        del counts[evicted], self.errors[evicted]
+        counts[item] = smallest + weight
+        self.errors[item] = smallest
+        heapq.heappush(self._heap, (smallest + weight, item))
+
+    def _pop_min(self):
+        heap, counts = self._heap, self.counts
+        while True:
+            count, item = heapq.heappop(heap)
+            if counts.get(item) == count:
+                return count, item
+            if item in counts:  # Stale entry: re-push with the current count
+                heapq.heappush(heap, (counts[item], item))
+
+    def merge(self, other):
+        """Combines another summary into this one (mergeable Space-Saving).
+
+        An item missing from a full summary may still have been seen there up
+        to that summary's smallest count, so that count is added to both its
+        estimate and its error; a summary that is not full missed nothing.
+        """
+        own_min = min(self.counts.values()) if len(self.counts) >= self.k else 0
+        other_min = min(other.counts.values()) if len(other.counts) >= other.k else 0
+        merged_counts = {}
+        merged_errors = {}
+        for item in self.counts.keys() | other.counts.keys():
+            merged_counts[item] = self.counts.get(item, own_min) + other.counts.get(item, other_min)
+            merged_errors[item] = self.errors.get(item, own_min) + other.errors.get(item, other_min)
+        keep = heapq.nlargest(self.k, merged_counts.items(), key=lambda x: x[1])
+        self.counts = dict(keep)
+        self.errors = {item: merged_errors[item] for item in self.counts}
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def most_common(self, k=None):
+        """(item, estimated count, error) triples, most frequent first."""
+        top = heapq.nlargest(self.k if k is None else k, self.counts.items(), key=lambda x: x[1])
+        return [(item, count, self.errors[item]) for item, count in top]
+
+
+# =====================
+# 3. Hash-based group-by
+# =====================
+
+def group_by(items, key):
+    """Groups items by key(item) in one pass; groups keep first-seen order, no sort needed."""
+    groups = defaultdict(list)
+    for item in items:
+        groups[key(item)].append(item)
+    return dict(groups)
+
+
+# =====================
+# 4. Files
+# =====================
+
+def iter_chunks(path, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """Yields the text of a file chunk_size characters at a time."""
+    with open(path, encoding=encoding) as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_words(path, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """Yields the whitespace-separated words of a file, one chunk in memory at a time."""
+    tail = ""
+    for chunk in iter_chunks(path, chunk_size, encoding):
+        words = (tail + chunk).split()
+        # The last word may continue in the next chunk, unless the chunk ends in whitespace
+        tail = "" if chunk[-1].isspace() or not words else words.pop()
+        yield from words
+    if tail:
+        yield tail
+
+
+_SPACE = re.compile(r"\s")  # The characters str.split() splits on
+
+
+def _utf8_boundary(file, position):
+    """The first offset at or after position where a UTF-8 character starts."""
+    file.seek(position)
+    while (byte := file.read(1)) and 0x80 <= byte[0] < 0xC0:  # Continuation byte
+        position += 1
+    return position
+
+
+def _count_range(path, start, end, chunk_size=CHUNK_SIZE):
+    """Counts the words that start inside bytes [start, end) of a file (runs in a worker).
+
+    The bytes are decoded and split with str.split(), like iter_words(), so
+    both count the same words (Unicode whitespace included).
+    """
+    counter = FrequencyCounter()
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    with open(path, "rb") as file:
+        start, end = _utf8_boundary(file, start), _utf8_boundary(file, end)
+        skip = False
+        if start > 0:
+            file.seek(max(0, start - 4))  # The character before start is at most 4 bytes
+            before = file.read(start - file.tell()).decode("utf-8", "replace")
+            skip = not before[-1].isspace()  # Skip the word cut by start; the previous range counts it
+        file.seek(start)
+        position = start
+        tail = ""
+        while position < end:
+            data = file.read(min(chunk_size, end - position))
+            if not data:
+                break
+            position += len(data)
+            text = decoder.decode(data)
+            if skip:
+                cut = _SPACE.search(text)
+                skip = cut is None
+                text = "" if skip else text[cut.start():]
+            if not text:
+                continue
+            words = (tail + text).split()
+            tail = "" if text[-1].isspace() or not words else words.pop()
+            counter.update(words)
+        if tail:  # The last word may run past end: read the rest of it
+            while data := file.read(chunk_size):
+                text = decoder.decode(data)
+                cut = _SPACE.search(text)
+                if cut is not None:
+                    tail += text[:cut.start()]
+                    break
+                tail += text
+            else:
+                tail += decoder.decode(b"", final=True)
+            counter.update([tail])
+    return counter
+
+
+def count_words_parallel(path, workers=None):
+    """Counts the words of one large file with a process per byte range."""
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    bounds = [size * i // workers for i in range(workers + 1)]
+    with ProcessPoolExecutor(workers) as pool:
+        parts = pool.map(_count_range, [path] * workers, bounds[:-1], bounds[1:])
+        return merge_counters(parts)
+
+
+# =====================
+# Benchmark
+# =====================
+
+def benchmark(n_words=1_000_000):
+    """Sort + groupby vs group_by(), then exact vs Space-Saving counts from a file."""
+    import random
+
+    vocabulary = [f"{chr(97 + i % 26)}word{i}" for i in range(50_000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]  # Zipf-like, like real text
+    words = random.choices(vocabulary, weights, k=n_words)
+
+    start = time.perf_counter()
+    ordered = sorted(words)
+    {k: list(v) for k, v in groupby(ordered, key=lambda x: x[0])}
+    print(f"sort + groupby:     {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    group_by(words, key=lambda x: x[0])
+    print(f"group_by (hash):    {time.perf_counter() - start:.3f}s")
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "words.txt")
+        with open(path, "w") as file:
+            file.write(" ".join(words))
+
+        start = time.perf_counter()
+        exact = FrequencyCounter(iter_words(path))
+        print(f"exact, streamed:    {time.perf_counter() - start:.3f}s ({len(exact):,} distinct)")
+
+        start = time.perf_counter()
+        approx = SpaceSaving(1000)
+        approx.update(iter_words(path))
+        print(f"Space-Saving k=1000: {time.perf_counter() - start:.3f}s")
+        top_exact = [item for item, _ in exact.most_common(10)]
+        top_approx = [item for item, _, _ in approx.most_common(10)]
+        print(f"  same top 10 as exact: {top_exact == top_approx}")
+
+        start = time.perf_counter()
+        parallel = count_words_parallel(path)
+        print(f"count_words_parallel: {time.perf_counter() - start:.3f}s "
+              f"(matches exact: {parallel.counts == exact.counts})")
+
+
+if __name__ == "__main__":
+    print(most_frequent_char("banana"))  # Expected: "a"
+    print(most_frequent_char(["hel", "lo wor", "ld"]))  # Expected: "l" (chunks are merged)
+
+    words = ["apple", "banana", "apricot", "cherry", "avocado", "blueberry"]
+    print(group_by(words, key=lambda x: x[0]))
+    # Expected: {'a': ['apple', 'apricot', 'avocado'], 'b': ['banana', 'blueberry'], 'c': ['cherry']}
+
+    left, right = FrequencyCounter("hello"), FrequencyCounter("world")
+    print(left.merge(right).most_common(2))  # Expected: [('l', 3), ('o', 2)]
+
+    hitters = SpaceSaving(2)
+    hitters.update("aaaaabbbcd")
+    print(hitters.most_common())  # Expected: [('a', 5, 0), ('d', 5, 4)] (d's true count is 1)
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,241 @@
+# Columnar Store for Student Marks
+#
+# map.py works on a dict {name: marks} and every question builds a new one:
+#   update  -> dict(map(lambda item: (item[0], item[1] + 5), students.items()))
+#   filter  -> dict(filter(lambda item: item[1] > 50, students.items()))
+#   total   -> reduce(lambda total, x: x[1] + total, students.items(), 0)
+#   highest -> reduce(lambda a, b: a if a[1] > b[1] else b, students.items())
+# Each pass walks (name, marks) tuples, and update/filter allocate a whole new dict.
+#
+# MarksTable keeps the same data as two columns:
+#   names -> a list of names (plus a name -> row index for lookups)
+#   marks -> an array('d'), 8 bytes per student
+# and offers:
+#   - add_to_all(5) / apply(func): update every mark in place
+#   - table.where(lambda m: m > 50) / table.above(50): a filtered *view* holding
+#     only a mask of 0/1 bytes; names and marks are not copied
+#   - table.total / table.highest: cached aggregates, kept up to date on every
+#     update, so reading them is O(1)
+#   - MarksTable.from_dict(students) and table.to_dict() to move between the two
+#
+# Run `python columnar.py --bench` to compare with the dict version from map.py.
+
+import operator
+import sys
+import time
+from array import array
+from functools import reduce
+from itertools import compress, repeat
+
+CHUNK_SIZE = 65_536  # Marks rewritten per slice by the bulk updates
+
+
+class MarksTable:
+    """Student names and marks stored as columns, with cached total and highest."""
+
+    def __init__(self, names=(), marks=()):
+        self.names = list(names)
+        self.marks = array("d", marks)
+        if len(self.names) != len(self.marks):
+            raise ValueError("names and marks must have the same length")
+        self._row = {name: row for row, name in enumerate(self.names)}
+        self._refresh()
+
+    @classmethod
+    def from_dict(cls, students):
+        """Builds a table from a {name: marks} dict like the one in map.py."""
+        return cls(students.keys(), students.values())
+
+    def to_dict(self):
+        """Returns the {name: marks} dict (marks as floats)."""
+        return dict(zip(self.names, self.marks))
+
+    def items(self):
+        """(name, marks) pairs, like dict.items()."""
+        return zip(self.names, self.marks)
+
+    # ---------------------
+    # Cached aggregates
+    # ---------------------
+
+    def _refresh(self):
+        """Recomputes total and highest with one pass over the marks column."""
+        self._total = sum(self.marks)
+        if self.marks:
+            best = max(self.marks)
+            # reduce(a if a > b else b) keeps the *last* of equal marks, so search from the end
+            self._best_row = len(self.marks) - 1 - operator.indexOf(reversed(self.marks), best)
+        else:
+            self._best_row = None
+        self._stale = False
+
+    @property
+    def total(self):
+        """Sum of all marks (O(1) unless a bulk apply() invalidated it)."""
+        if self._stale:
+            self._refresh()
+        return self._total
+
+    @property
+    def highest(self):
+        """(name, marks) of the top student, or None for an empty table."""
+        if self._stale:
+            self._refresh()
+        if self._best_row is None:
+            return None
+        return self.names[self._best_row], self.marks[self._best_row]
+
+    # ---------------------
+    # Single-student access
+    # ---------------------
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._row
+
+    def __getitem__(self, name):
+        return self.marks[self._row[name]]
+
+    def __setitem__(self, name, value):
+        """Sets one student's marks (adds the student if new), keeping the aggregates current."""
+        row = self._row.get(name)
+        if row is None:
+            row = len(self.names)
+            self.names.append(name)
+            self.marks.append(value)
+            self._row[name] = row
+            old = None
+        else:
+            old = self.marks[row]
+            self.marks[row] = value
+        if self._stale:
+            return
+        self._total += value - (old or 0.0)
+        best = self._best_row
+        if best is None or value > self.marks[best] or (value == self.marks[best] and row > best):
+            self._best_row = row
+        elif row == best and value < old:
+            self._stale = True  # The top student dropped; find the new one on next read
+
+    # ---------------------
+    # Bulk updates (in place)
+    # ---------------------
+
+    def _update(self, func, *args):
+        """marks[i] = func(marks[i], *args) for every i, one CHUNK_SIZE slice at a time.
+
+        Only one chunk is held as a temporary array, whatever the table size.
+        """
+        marks = self.marks
+        for start in range(0, len(marks), CHUNK_SIZE):
+            chunk = marks[start:start + CHUNK_SIZE]
+            marks[start:start + len(chunk)] = array("d", map(func, chunk, *map(repeat, args)))
+
+    def add_to_all(self, delta):
+        """Adds delta to every mark in place; total and highest shift without a rescan."""
+        self._update(operator.add, delta)
+        if not self._stale:
+            self._total += delta * len(self.marks)
+
+    def apply(self, func):
+        """Replaces every mark m with func(m) in place (aggregates are recomputed lazily)."""
+        self._update(func)
+        self._stale = True
+
+    # ---------------------
+    # Filtered views
+    # ---------------------
+
+    def where(self, predicate):
+        """View of the students whose marks satisfy predicate(marks)."""
+        return MarksView(self, bytearray(map(bool, map(predicate, self.marks))))
+
+    def above(self, threshold):
+        """View of the students with marks > threshold (no per-item Python call)."""
+        return MarksView(self, bytearray(map(operator.gt, self.marks, repeat(threshold))))
+
+
+class MarksView:
+    """Rows of a MarksTable selected by a 0/1 mask; reads the table's columns directly."""
+
+    def __init__(self, table, mask):
+        self.table = table
+        self.mask = mask
+
+    def __len__(self):
+        return self.mask.count(1)
+
+    def names(self):
+        return list(compress(self.table.names, self.mask))
+
+    def marks(self):
+        return array("d", compress(self.table.marks, self.mask))
+
+    def items(self):
+        return compress(self.table.items(), self.mask)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def total(self):
+        return sum(compress(self.table.marks, self.mask))
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _best(func, repeat_count=3):
+    best = float("inf")
+    for _ in range(repeat_count):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(n=1_000_000):
+    """Times map.py's dict passes against the columnar table for n students."""
+    students = {f"student{i}": i % 100 for i in range(n)}
+    table = MarksTable.from_dict(students)
+
+    rows = [
+        ("update +5",
+         lambda: dict(map(lambda item: (item[0], item[1] + 5), students.items())),
+         lambda: table.add_to_all(5)),
+        ("filter > 50",
+         lambda: dict(filter(lambda item: item[1] > 50, students.items())),
+         lambda: table.above(50)),
+        ("total",
+         lambda: reduce(lambda total, x: x[1] + total, students.items(), 0),
+         lambda: table.total),
+        ("highest",
+         lambda: reduce(lambda a, b: a if a[1] > b[1] else b, students.items()),
+         lambda: table.highest),
+    ]
+    print(f"{n:,} students")
+    print(f"{'operation':>12} {'dict':>10} {'columnar':>10}")
+    for name, old, new in rows:
+        print(f"{name:>12} {_best(old) * 1e3:8.1f}ms {_best(new) * 1e3:8.3f}ms")
+
+
+if __name__ == "__main__":
+    students = {'abhi': 90, "sam": 55, "adam": 33}
+    table = MarksTable.from_dict(students)
+
+    table.add_to_all(5)
+    print("Updated Student Marks:", table.to_dict())  # {'abhi': 95.0, 'sam': 60.0, 'adam': 38.0}
+
+    top = table.above(50)
+    print("Students with marks > 50:", top.to_dict())  # {'abhi': 95.0, 'sam': 60.0}
+
+    print("Total Marks:", table.total)  # 193.0
+    print("Highest Scoring Student:", table.highest)  # ('abhi', 95.0)
+
+    table["sam"] = 99
+    print("Highest after update:", table.highest, table.total)  # ('sam', 99.0) 232.0
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,345 @@
+# Selectable Engines for the Recursive Problems in main.py
+#
+# The textbook versions in main.py are easy to read, but:
+#   - fibonacci() makes two calls per level, so it takes exponential time
+#   - factorial(), power() and sum_of_digits() add one stack frame per step,
+#     so they hit Python's recursion limit (about 1000 frames) on big inputs
+#
+# This module gives the same answers through a choice of engines:
+#   "recursive" -> the textbook versions from main.py (the baseline)
+#   "memo"      -> LRU-bounded memoization with functools.lru_cache
+#   "iterative" -> plain loops, the call stack never grows
+#   "fast"      -> fast doubling (fibonacci), exponentiation by squaring (power),
+#                  binary splitting (factorial), divide-and-conquer digits
+#
+# Usage:
+#   factorial(500)                      # default engine ("iterative")
+#   fibonacci(10**5, engine="fast")
+#   power(3, 2000, engine="memo")
+#
+# Run `python engines.py --bench` to print the timing table and crossover points.
+#
+# Negative n is handled before any engine runs, the same way for all of them:
+# factorial() and fibonacci() raise ValueError, sum_of_digits() uses abs(n),
+# and power(x, -n) is 1 / power(x, n). For float bases, "fast" power multiplies
+# in a different order than the linear versions, so the last bits may differ.
+
+import sys
+import time
+from functools import lru_cache
+
+MEMO_SIZE = 1024  # Max entries kept by each memoized function
+_MEMO_STEP = 256  # The memo engine warms its cache in steps of this size
+
+
+# =====================
+# 1. Recursive (main.py)
+# =====================
+
+def _factorial_recursive(n):
+    if n <= 1:
+        return 1  # main.py stops at n == 1; n == 0 also gives 1 here
+    return n * _factorial_recursive(n - 1)
+
+
+def _fibonacci_recursive(n):
+    if n < 2:
+        return n
+    return _fibonacci_recursive(n - 1) + _fibonacci_recursive(n - 2)
+
+
+def _sum_of_digits_recursive(n):
+    if n == 0:
+        return 0
+    return (n % 10) + _sum_of_digits_recursive(n // 10)
+
+
+def _power_recursive(x, n):
+    if n == 0:
+        return 1
+    return x * _power_recursive(x, n - 1)
+
+
+# =====================
+# 2. Memoized (LRU)
+# =====================
+# Each call below is cached, and the wrappers first fill the cache from the
+# bottom up in steps of _MEMO_STEP. That keeps the recursion depth of any single
+# call under _MEMO_STEP frames, so large n no longer hits the recursion limit.
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _factorial_cached(n):
+    if n <= 1:
+        return 1
+    return n * _factorial_cached(n - 1)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _fibonacci_cached(n):
+    if n < 2:
+        return n
+    return _fibonacci_cached(n - 1) + _fibonacci_cached(n - 2)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _sum_of_digits_cached(n):
+    if n == 0:
+        return 0
+    return (n % 10) + _sum_of_digits_cached(n // 10)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _power_cached(x, n):
+    if n == 0:
+        return 1
+    return x * _power_cached(x, n - 1)
+
+
+def _factorial_memo(n):
+    for k in range(_MEMO_STEP, n, _MEMO_STEP):
+        _factorial_cached(k)
+    return _factorial_cached(n)
+
+
+def _fibonacci_memo(n):
+    for k in range(_MEMO_STEP, n, _MEMO_STEP):
+        _fibonacci_cached(k)
+    return _fibonacci_cached(n)
+
+
+def _sum_of_digits_memo(n):
+    # The recursion walks n, n // 10, n // 100, ... so warm it from the top digits
+    chain = []
+    while n:
+        chain.append(n)
+        n //= 10
+    for m in reversed(chain[::_MEMO_STEP]):
+        _sum_of_digits_cached(m)
+    return _sum_of_digits_cached(chain[0]) if chain else 0
+
+
+def _power_memo(x, n):
+    for k in range(_MEMO_STEP, n, _MEMO_STEP):
+        _power_cached(x, k)
+    return _power_cached(x, n)
+
+
+def clear_memo():
+    """Empties the caches used by the "memo" engine."""
+    for cached in (_factorial_cached, _fibonacci_cached,
+                   _sum_of_digits_cached, _power_cached):
+        cached.cache_clear()
+
+
+# =====================
+# 3. Iterative
+# =====================
+
+def _factorial_iterative(n):
+    result = 1
+    for k in range(2, n + 1):
+        result *= k
+    return result
+
+
+def _fibonacci_iterative(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def _sum_of_digits_iterative(n):
+    total = 0
+    while n:
+        n, digit = divmod(n, 10)
+        total += digit
+    return total
+
+
+def _power_iterative(x, n):
+    result = 1
+    for _ in range(n):
+        result *= x
+    return result
+
+
+# =====================
+# 4. Fast
+# =====================
+
+def _product(lo, hi):
+    """Product of lo * (lo + 1) * ... * (hi - 1), split in halves (depth log n)."""
+    if hi - lo <= 16:
+        result = 1
+        for k in range(lo, hi):
+            result *= k
+        return result
+    mid = (lo + hi) // 2
+    return _product(lo, mid) * _product(mid, hi)
+
+
+def _factorial_fast(n):
+    return _product(2, n + 1)
+
+
+def _fibonacci_fast(n):
+    # Fast doubling: F(2k) = F(k) * (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
+    a, b = 0, 1  # F(k), F(k + 1) for k = the bits of n read so far
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        a, b = (d, c + d) if bit == "1" else (c, d)
+    return a
+
+
+_DIGITS_LEAF = 300  # Below this many digits, str() is the quickest way in
+
+
+def _sum_of_digits_fast(n):
+    digits = n.bit_length() * 30103 // 100000 + 1  # log10(2) ~ 0.30103
+    if digits <= _DIGITS_LEAF:
+        return sum(map(int, str(n)))
+    high, low = divmod(n, 10 ** (digits // 2))
+    return _sum_of_digits_fast(high) + _sum_of_digits_fast(low)
+
+
+def _power_fast(x, n):
+    # Exponentiation by squaring: log2(n) squarings instead of n multiplications
+    result = 1
+    while n:
+        if n & 1:
+            result *= x
+        x *= x
+        n >>= 1
+    return result
+
+
+# =====================
+# Engine selection
+# =====================
+
+ENGINES = {
+    "recursive": {
+        "factorial": _factorial_recursive,
+        "fibonacci": _fibonacci_recursive,
+        "sum_of_digits": _sum_of_digits_recursive,
+        "power": _power_recursive,
+    },
+    "memo": {
+        "factorial": _factorial_memo,
+        "fibonacci": _fibonacci_memo,
+        "sum_of_digits": _sum_of_digits_memo,
+        "power": _power_memo,
+    },
+    "iterative": {
+        "factorial": _factorial_iterative,
+        "fibonacci": _fibonacci_iterative,
+        "sum_of_digits": _sum_of_digits_iterative,
+        "power": _power_iterative,
+    },
+    "fast": {
+        "factorial": _factorial_fast,
+        "fibonacci": _fibonacci_fast,
+        "sum_of_digits": _sum_of_digits_fast,
+        "power": _power_fast,
+    },
+}
+
+DEFAULT_ENGINE = "iterative"
+
+
+def _pick(problem, engine):
+    try:
+        return ENGINES[engine][problem]
+    except KeyError:
+        raise ValueError(f"Unknown engine {engine!r}, choose from {sorted(ENGINES)}") from None
+
+
+def _non_negative(n, problem):
+    if n < 0:
+        raise ValueError(f"{problem}() is not defined for negative n ({n})")
+    return n
+
+
+def factorial(n, engine=DEFAULT_ENGINE):
+    """Returns n! using the chosen engine; ValueError for negative n."""
+    return _pick("factorial", engine)(_non_negative(n, "factorial"))
+
+
+def fibonacci(n, engine=DEFAULT_ENGINE):
+    """Returns the nth Fibonacci number using the chosen engine; ValueError for negative n."""
+    return _pick("fibonacci", engine)(_non_negative(n, "fibonacci"))
+
+
+def sum_of_digits(n, engine=DEFAULT_ENGINE):
+    """Returns the sum of the decimal digits of n (of abs(n) if negative) using the chosen engine."""
+    return _pick("sum_of_digits", engine)(abs(n))
+
+
+def power(x, n, engine=DEFAULT_ENGINE):
+    """Returns x raised to the power n using the chosen engine (1 / x**-n for negative n)."""
+    if n < 0:
+        return 1 / _pick("power", engine)(x, -n)
+    return _pick("power", engine)(x, n)
+
+
+# =====================
+# Benchmark
+# =====================
+
+# Sizes past these limits are skipped for the recursive engine
+# (exponential time for fibonacci, recursion limit for the rest).
+_RECURSIVE_LIMITS = {"factorial": 900, "fibonacci": 25, "sum_of_digits": 10**900, "power": 900}
+
+_BENCH_CASES = {
+    "factorial": (lambda f, n: f(n), [10, 100, 500, 2_000, 10_000]),
+    "fibonacci": (lambda f, n: f(n), [10, 20, 25, 1_000, 10_000, 100_000]),
+    "sum_of_digits": (lambda f, n: f(n), [10**5, 10**50, 10**500, 10**3000]),
+    "power": (lambda f, n: f(3, n), [10, 100, 500, 2_000, 10_000]),
+}
+
+
+def _time_call(call, func, n, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        clear_memo()  # Time the memo engine from a cold cache
+        start = time.perf_counter()
+        call(func, n)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark():
+    """Prints the time of every engine per size and which engine wins."""
+    names = list(ENGINES)
+    for problem, (call, sizes) in _BENCH_CASES.items():
+        print(f"\n{problem}")
+        print(f"{'n':>12} " + " ".join(f"{name:>11}" for name in names) + "   winner")
+        for n in sizes:
+            timings = {}
+            for name in names:
+                if name == "recursive" and n > _RECURSIVE_LIMITS[problem]:
+                    continue
+                timings[name] = _time_call(call, ENGINES[name][problem], n)
+            cells = [f"{timings[name] * 1e3:9.3f}ms" if name in timings else f"{'-':>11}"
+                     for name in names]
+            label = f"10^{n.bit_length() * 30103 // 100000}" if n >= 10**12 else str(n)
+            print(f"{label:>12} " + " ".join(cells) + f"   {min(timings, key=timings.get)}")
+
+
+if __name__ == "__main__":
+    for engine in ENGINES:
+        print(engine,
+              factorial(5, engine),       # Expected: 120
+              fibonacci(6, engine),       # Expected: 8
+              sum_of_digits(1234, engine),  # Expected: 10
+              power(2, 3, engine))        # Expected: 8
+
+    # Sizes that break the textbook versions
+    print(factorial(3000, "fast") == factorial(3000))  # Expected: True
+    print(fibonacci(5000, "memo") == fibonacci(5000, "fast"))  # Expected: True
+    print(power(2, 5000, "iterative") == 2 ** 5000)  # Expected: True
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,126 @@
+# Streaming Tower of Hanoi
+#
+# tower_of_hanoi() in main.py prints every move while it recurses. That is fine
+# for 3 disks, but n disks need 2^n - 1 moves (33 million for n = 25), so the
+# program spends all its time in print() and nobody can use the moves in code.
+#
+# Here the moves come from an iterative, non-recursive Gray-code formula.
+# For move number m = 1, 2, ..., 2^n - 1:
+#   disk   = the position of the lowest set bit of m (m & -m)
+#   source = (m & (m - 1)) % 3
+#   target = ((m | (m - 1)) + 1) % 3
+# These peg numbers solve the puzzle from peg 0 to peg 2 when n is odd and to
+# peg 1 when n is even, so the labels are swapped for even n.
+#
+#   hanoi_moves(n)   -> generator of (disk, src, dst) tuples, O(1) per move
+#   move_at(k, n)    -> the k-th move (0-based) directly, in O(n) bit operations
+#   write_moves(...) -> writes the moves as text in large batches
+#
+# Run `python hanoi.py --bench` to compare with the print-per-move version.
+
+import os
+import sys
+import tempfile
+import time
+
+MOVE_FORMAT = "Move disk %d from %s to %s\n"  # Same text as main.py prints
+
+
+def _pegs(n, source, auxiliary, target):
+    """Maps the formula's peg numbers 0, 1, 2 onto the given labels."""
+    if n % 2:
+        return (source, auxiliary, target)
+    return (source, target, auxiliary)
+
+
+def move_count(n):
+    """Number of moves needed for n disks."""
+    return (1 << n) - 1
+
+
+def hanoi_moves(n, source="A", auxiliary="B", target="C"):
+    """Yields every move as a (disk, src, dst) tuple, in the same order as main.py."""
+    pegs = _pegs(n, source, auxiliary, target)
+    for m in range(1, 1 << n):
+        yield ((m & -m).bit_length(), pegs[(m & (m - 1)) % 3], pegs[((m | (m - 1)) + 1) % 3])
+
+
+def move_at(k, n, source="A", auxiliary="B", target="C"):
+    """Returns move number k (0-based) without generating the moves before it."""
+    if not 0 <= k < move_count(n):
+        raise IndexError(f"move {k} out of range for {n} disks")
+    m = k + 1
+    pegs = _pegs(n, source, auxiliary, target)
+    return ((m & -m).bit_length(), pegs[(m & (m - 1)) % 3], pegs[((m | (m - 1)) + 1) % 3])
+
+
+def write_moves(n, file, source="A", auxiliary="B", target="C", batch_size=1 << 16):
+    """Writes all moves to file, one write() per batch_size moves. Returns the move count.
+
+    Every possible line (n disks x 3 sources x 3 targets) is formatted once up
+    front, so each move is just a table lookup.
+    """
+    pegs = _pegs(n, source, auxiliary, target)
+    lines = [[[MOVE_FORMAT % (disk, src, dst) for dst in pegs] for src in pegs]
+             for disk in range(n + 1)]
+    total = move_count(n)
+    for lo in range(1, total + 1, batch_size):
+        hi = min(lo + batch_size, total + 1)
+        file.write("".join([lines[(m & -m).bit_length()][(m & (m - 1)) % 3][((m | (m - 1)) + 1) % 3]
+                            for m in range(lo, hi)]))
+    return total
+
+
+def tower_of_hanoi(n, source, auxiliary, target, file=None):
+    """Drop-in for main.py's tower_of_hanoi(): same output, batched writes (stdout by default)."""
+    write_moves(n, sys.stdout if file is None else file, source, auxiliary, target)
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _tower_of_hanoi_print(n, source, auxiliary, target, file):
+    """main.py's version, printing to file instead of the screen."""
+    if n == 1:
+        print(f"Move disk 1 from {source} to {target}", file=file)
+        return
+    _tower_of_hanoi_print(n - 1, source, target, auxiliary, file)
+    print(f"Move disk {n} from {source} to {target}", file=file)
+    _tower_of_hanoi_print(n - 1, auxiliary, source, target, file)
+
+
+def benchmark(sizes=(16, 18, 20)):
+    """Times print-per-move vs batched writes into a temporary file, then move_at()."""
+    print(f"{'n':>4} {'moves':>11} {'print':>9} {'batched':>9} {'generate':>9}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "moves.txt")
+        for n in sizes:
+            with open(path, "w") as file:
+                start = time.perf_counter()
+                _tower_of_hanoi_print(n, "A", "B", "C", file)
+                printed = time.perf_counter() - start
+            with open(path, "w") as file:
+                start = time.perf_counter()
+                write_moves(n, file)
+                batched = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in hanoi_moves(n):
+                pass
+            generated = time.perf_counter() - start
+            print(f"{n:>4} {move_count(n):>11,} {printed:8.2f}s {batched:8.2f}s {generated:8.2f}s")
+
+    start = time.perf_counter()
+    for k in range(0, move_count(64), move_count(64) // 10_000):
+        move_at(k, 64)
+    print(f"\nmove_at on 64 disks: {(time.perf_counter() - start) / 10_000 * 1e6:.2f}us per move")
+
+
+if __name__ == "__main__":
+    tower_of_hanoi(3, "A", "B", "C")  # Same 7 lines as main.py
+    print(list(hanoi_moves(2)))  # Expected: [(1, 'A', 'B'), (2, 'A', 'C'), (1, 'B', 'C')]
+    print(move_at(3, 3))  # Expected: (3, 'A', 'C')
+    print(move_at(2**40, 50))  # Computed directly, without the 2^40 earlier moves
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,262 @@
+# Divide-and-Conquer Reductions (max / min / argmax)
+#
+# find_max(lst, n) in main.py recurses once per element: a list of 1000+ items
+# hits the recursion limit, and every comparison pays for a Python call frame.
+#
+# Here the list is split in halves instead, so the depth is log2(n) and each
+# leaf (up to _LEAF items) is handed to the builtin max()/min() in one go.
+#   dc_max(data), dc_min(data)       -> largest / smallest value
+#   dc_argmax(data), dc_argmin(data) -> index of the first largest / smallest value
+#   find_max(lst, n)                 -> drop-in for main.py's version
+#
+# data can be a list, tuple, array.array or anything with the buffer protocol
+# (bytes, bytearray, mmap, memoryview). Buffers are wrapped in a memoryview;
+# list, tuple and array leaves are slices, which copy up to _LEAF items.
+#
+# If NumPy is installed, large inputs take a NumPy fast path (the pure-Python
+# code still works without it). Pass use_numpy=False to always skip it.
+#
+# For data that does not fit in memory, chunked_max()/chunked_argmax() reduce
+# over an iterator of arrays (e.g. read_chunks() streaming a binary file), so
+# only one chunk is held at a time.
+#
+# Run `python reduction.py --bench` to compare the approaches.
+
+import operator
+import os
+import sys
+import tempfile
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+_LEAF = 4096  # Windows this small go straight to the builtin max()/min()
+NUMPY_THRESHOLD = 10_000  # Below this many items NumPy's call overhead is not worth it
+
+
+def _as_sequence(data):
+    """Returns something indexable and sliceable without copying data."""
+    if hasattr(data, "__getitem__") and hasattr(data, "__len__") and not isinstance(
+            data, (bytes, bytearray)):
+        return data
+    return memoryview(data)  # bytes, bytearray, mmap, other buffers
+
+
+def _numpy_view(data, use_numpy):
+    """Returns data as a NumPy array when the fast path applies, else None."""
+    if np is None or use_numpy is False:
+        return None
+    if isinstance(data, np.ndarray):
+        return data
+    if use_numpy is None and len(data) < NUMPY_THRESHOLD:
+        return None
+    try:
+        view = memoryview(data)  # array.array, bytes, mmap, ...
+    except TypeError:  # list, tuple, range, ...: converting copies every item
+        return np.asarray(data) if use_numpy else None
+    return np.asarray(view)
+
+
+# =====================
+# 1. Values (max / min)
+# =====================
+
+def _reduce_values(seq, lo, hi, pick):
+    if hi - lo <= _LEAF:
+        return pick(seq[lo:hi])
+    mid = (lo + hi) // 2
+    return pick(_reduce_values(seq, lo, mid, pick), _reduce_values(seq, mid, hi, pick))
+
+
+def dc_max(data, use_numpy=None):
+    """Largest value of data, found by splitting it in halves."""
+    fast = _numpy_view(data, use_numpy)
+    if fast is not None:
+        return fast.max().item()
+    seq = _as_sequence(data)
+    if len(seq) == 0:
+        raise ValueError("dc_max() arg is an empty sequence")
+    return _reduce_values(seq, 0, len(seq), max)
+
+
+def dc_min(data, use_numpy=None):
+    """Smallest value of data, found by splitting it in halves."""
+    fast = _numpy_view(data, use_numpy)
+    if fast is not None:
+        return fast.min().item()
+    seq = _as_sequence(data)
+    if len(seq) == 0:
+        raise ValueError("dc_min() arg is an empty sequence")
+    return _reduce_values(seq, 0, len(seq), min)
+
+
+# =====================
+# 2. Positions (argmax / argmin)
+# =====================
+
+def _reduce_index(seq, lo, hi, pick, better):
+    """Returns (index, value) of the first best item in seq[lo:hi]."""
+    if hi - lo <= _LEAF:
+        leaf = seq[lo:hi]
+        value = pick(leaf)
+        return lo + operator.indexOf(leaf, value), value
+    mid = (lo + hi) // 2
+    left = _reduce_index(seq, lo, mid, pick, better)
+    right = _reduce_index(seq, mid, hi, pick, better)
+    return right if better(right[1], left[1]) else left  # Ties keep the left (first) one
+
+
+def dc_argmax(data, use_numpy=None):
+    """Index of the first largest value of data."""
+    fast = _numpy_view(data, use_numpy)
+    if fast is not None:
+        return int(fast.argmax())
+    seq = _as_sequence(data)
+    if len(seq) == 0:
+        raise ValueError("dc_argmax() arg is an empty sequence")
+    return _reduce_index(seq, 0, len(seq), max, operator.gt)[0]
+
+
+def dc_argmin(data, use_numpy=None):
+    """Index of the first smallest value of data."""
+    fast = _numpy_view(data, use_numpy)
+    if fast is not None:
+        return int(fast.argmin())
+    seq = _as_sequence(data)
+    if len(seq) == 0:
+        raise ValueError("dc_argmin() arg is an empty sequence")
+    return _reduce_index(seq, 0, len(seq), min, operator.lt)[0]
+
+
+def find_max(lst, n):
+    """Drop-in for main.py's find_max(): the maximum of the first n elements."""
+    if n == len(lst):
+        return dc_max(lst)
+    return dc_max(memoryview(lst)[:n] if not isinstance(lst, (list, tuple)) else lst[:n])
+
+
+# =====================
+# 3. Chunked (streamed) reductions
+# =====================
+
+def read_chunks(path, typecode="d", chunk_items=1 << 20):
+    """Yields array(typecode) chunks of a binary file, chunk_items values at a time."""
+    with open(path, "rb") as file:
+        while True:
+            chunk = array(typecode)
+            try:
+                chunk.fromfile(file, chunk_items)
+            except EOFError:  # Last, shorter chunk: fromfile() keeps what it read
+                pass
+            if not chunk:
+                return
+            yield chunk
+
+
+def chunked_max(chunks, use_numpy=None):
+    """Largest value over an iterator of arrays, holding one chunk at a time."""
+    best = None
+    for chunk in chunks:
+        if len(chunk):
+            value = dc_max(chunk, use_numpy)
+            if best is None or value > best:
+                best = value
+    if best is None:
+        raise ValueError("chunked_max() got no values")
+    return best
+
+
+def chunked_min(chunks, use_numpy=None):
+    """Smallest value over an iterator of arrays, holding one chunk at a time."""
+    best = None
+    for chunk in chunks:
+        if len(chunk):
+            value = dc_min(chunk, use_numpy)
+            if best is None or value < best:
+                best = value
+    if best is None:
+        raise ValueError("chunked_min() got no values")
+    return best
+
+
+def chunked_argmax(chunks, use_numpy=None):
+    """(global index, value) of the first largest value over an iterator of arrays."""
+    best_index, best, offset = None, None, 0
+    for chunk in chunks:
+        if len(chunk):
+            index = dc_argmax(chunk, use_numpy)
+            if best is None or chunk[index] > best:
+                best_index, best = offset + index, chunk[index]
+        offset += len(chunk)
+    if best is None:
+        raise ValueError("chunked_argmax() got no values")
+    return best_index, best
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _find_max_recursive(lst, n):
+    """main.py's version."""
+    if n == 1:
+        return lst[0]
+    return max(lst[n - 1], _find_max_recursive(lst, n - 1))
+
+
+def _best(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark():
+    """Times main.py's find_max against the d&c, NumPy and chunked paths."""
+    import random
+
+    print(f"{'n':>10} {'recursive':>10} {'dc list':>10} {'dc array':>10} {'argmax':>10} {'numpy':>10}")
+    for n in (900, 100_000, 1_000_000, 10_000_000):
+        values = array("d", (random.random() for _ in range(n)))
+        as_list = values.tolist()
+        cells = [
+            _best(_find_max_recursive, as_list, n) if n < 950 else None,
+            _best(dc_max, as_list, False),
+            _best(dc_max, values, False),
+            _best(dc_argmax, values, False),
+            _best(dc_max, values, True) if np is not None else None,
+        ]
+        print(f"{n:>10,} " + " ".join(f"{c * 1e3:8.2f}ms" if c is not None else f"{'-':>10}"
+                                      for c in cells))
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "values.bin")
+        with open(path, "wb") as file:
+            for _ in range(8):  # 8 x 1M doubles = 64 MB, written one chunk at a time
+                array("d", (random.random() for _ in range(1 << 20))).tofile(file)
+        start = time.perf_counter()
+        index, value = chunked_argmax(read_chunks(path))
+        print(f"\nchunked_argmax over a 64 MB file: {time.perf_counter() - start:.3f}s "
+              f"(max {value:.6f} at index {index:,})")
+
+
+if __name__ == "__main__":
+    print(find_max([1, 4, 9, 3, 7], 5))  # Expected: 9
+    print(dc_argmax([1, 9, 4, 9]))  # Expected: 1 (first of the two 9s)
+    print(dc_min(array("i", [5, -2, 8])))  # Expected: -2
+    print(dc_max(b"hello"))  # Expected: 111 (the byte value of "o")
+
+    big = list(range(100_000))  # Far past main.py's recursion limit
+    print(dc_max(big), dc_argmin(big))  # Expected: 99999 0
+
+    chunks = (array("d", [float(i), float(-i)]) for i in range(1000))
+    print(chunked_argmax(chunks))  # Expected: (1998, 999.0)
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,261 @@
+# Slice-free String Recursion
+#
+# reverse_string(), is_palindrome() and count_char() in main.py recurse on a
+# new slice every call (s[:-1], s[1:-1], s[1:]):
+#   - every slice copies the rest of the string -> O(n^2) time and allocation
+#   - one stack frame per character -> strings over ~1000 chars fail
+#
+# The versions below keep the same signatures but recurse on an index window
+# (lo, hi) of the original string, so nothing is copied. Each call splits the
+# window in half, so the recursion depth is log2(n) instead of n.
+#
+# The bulk helpers at the bottom work on whole batches of tokens (str, bytes or
+# memoryview), pushing the per-token work into C. For a whole bytes buffer (e.g.
+# a log file read or mmap'ed in one go):
+#   - split_tokens() cuts it into zero-copy memoryview tokens
+#   - token_blocks() copies it ~1 MB at a time and splits each block in C, which
+#     is the fastest way through; the *_buffer() helpers are built on it
+#
+# Run `python strings.py --bench` to compare with the slicing versions.
+
+import operator
+import re
+import sys
+import time
+from array import array
+
+_LEAF = 64  # Windows this small are handled with a plain loop
+
+
+# =====================
+# 1. Reverse a String
+# =====================
+
+def _reverse_into(s, out, lo, hi):
+    """Writes s[lo:hi] reversed into its mirrored positions of out."""
+    if hi - lo <= _LEAF:
+        last = len(s) - 1
+        for i in range(lo, hi):
+            out[last - i] = s[i]
+        return
+    mid = (lo + hi) // 2
+    _reverse_into(s, out, lo, mid)
+    _reverse_into(s, out, mid, hi)
+
+
+def reverse_string(s):
+    """Reverses s without creating intermediate slices."""
+    out = [""] * len(s)
+    _reverse_into(s, out, 0, len(s))
+    return "".join(out)
+
+
+# =====================
+# 2. Check Palindrome
+# =====================
+
+def _mirrors(s, lo, hi):
+    """True if s[i] == s[-1 - i] for every i in the window [lo, hi)."""
+    if hi - lo <= _LEAF:
+        last = len(s) - 1
+        for i in range(lo, hi):
+            if s[i] != s[last - i]:
+                return False
+        return True
+    mid = (lo + hi) // 2
+    return _mirrors(s, lo, mid) and _mirrors(s, mid, hi)
+
+
+def is_palindrome(s):
+    """Checks if s is a palindrome by comparing mirrored index windows."""
+    return _mirrors(s, 0, len(s) // 2)
+
+
+# =====================
+# 3. Count Occurrences of a Character
+# =====================
+
+def _count_in(s, char, lo, hi):
+    if hi - lo <= _LEAF:
+        count = 0
+        for i in range(lo, hi):
+            if s[i] == char:
+                count += 1
+        return count
+    mid = (lo + hi) // 2
+    return _count_in(s, char, lo, mid) + _count_in(s, char, mid, hi)
+
+
+def count_char(s, char):
+    """Counts occurrences of char in s over index windows."""
+    return _count_in(s, char, 0, len(s))
+
+
+# =====================
+# 4. Bulk APIs
+# =====================
+
+def split_tokens(buffer, sep=b"\n"):
+    """Yields the non-empty sep-separated tokens of buffer as memoryview slices (no copies)."""
+    if not sep:
+        raise ValueError("empty separator")
+    view = memoryview(buffer).cast("B")
+    if len(sep) == 1:  # A run of other bytes is a token: one match per token
+        for match in re.finditer(b"[^" + re.escape(sep) + b"]+", view):
+            yield view[match.start():match.end()]
+        return
+    start = 0  # Longer seps: the gaps between separators, found left to right like bytes.split
+    for match in re.finditer(re.escape(sep), view):
+        if match.start() > start:
+            yield view[start:match.start()]
+        start = match.end()
+    if start < len(view):
+        yield view[start:]
+
+
+def token_blocks(buffer, sep=b"\n", block_size=1 << 20):
+    """Yields lists of the non-empty tokens of buffer, one list per ~block_size bytes.
+
+    Only one block is copied at a time, so memory stays bounded for huge buffers.
+    """
+    view = memoryview(buffer).cast("B")
+    start, size = 0, len(view)
+    while start < size:
+        end = min(start + block_size, size)
+        block = view[start:end].tobytes()
+        tokens = block.split(sep)
+        while end < size and len(tokens) == 1:  # One token longer than the block
+            end = min(end + block_size, size)
+            block = view[start:end].tobytes()
+            tokens = block.split(sep)
+        if end < size:  # The last token may go on past the block: leave it for the next one
+            block = block[:len(block) - len(tokens.pop())]
+        yield list(filter(None, tokens))
+        start += len(block)
+
+
+def reverse_many(tokens):
+    """Returns each token reversed (memoryview tokens come back as bytes)."""
+    return [tok[::-1].tobytes() if isinstance(tok, memoryview) else tok[::-1]
+            for tok in tokens]
+
+
+def palindrome_flags(tokens):
+    """Returns a bytearray with 1 for every token that is a palindrome, else 0.
+
+    For memoryview tokens, tok[::-1] is a reversed view, not a copy.
+    """
+    return bytearray(tok == tok[::-1] for tok in tokens)
+
+
+def count_char_many(tokens, char):
+    """Returns array('q') with the number of times char occurs in each token."""
+    code = ord(char) if isinstance(char, str) else char[0]  # For bytes/memoryview tokens
+    counts = array("q")
+    for tok in tokens:
+        if isinstance(tok, str):
+            counts.append(tok.count(char))
+        elif isinstance(tok, memoryview):
+            counts.append(operator.countOf(tok, code))
+        else:
+            counts.append(tok.count(code))
+    return counts
+
+
+def palindrome_flags_buffer(buffer, sep=b"\n"):
+    """palindrome_flags() for every token of a bytes buffer."""
+    flags = bytearray()
+    for tokens in token_blocks(buffer, sep):
+        flags += palindrome_flags(tokens)
+    return flags
+
+
+def count_char_buffer(buffer, char, sep=b"\n"):
+    """count_char_many() for every token of a bytes buffer."""
+    counts = array("q")
+    for tokens in token_blocks(buffer, sep):
+        counts += count_char_many(tokens, char)
+    return counts
+
+
+# =====================
+# Benchmark
+# =====================
+
+def _reverse_sliced(s):
+    if len(s) == 0:
+        return ""
+    return s[-1] + _reverse_sliced(s[:-1])
+
+
+def _is_palindrome_sliced(s):
+    if len(s) <= 1:
+        return True
+    if s[0] != s[-1]:
+        return False
+    return _is_palindrome_sliced(s[1:-1])
+
+
+def _count_char_sliced(s, char):
+    if len(s) == 0:
+        return 0
+    return (1 if s[0] == char else 0) + _count_char_sliced(s[1:], char)
+
+
+def _best(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark():
+    """Times slicing vs index-window recursion, then the bulk token path."""
+    print(f"{'n':>9} {'op':>14} {'sliced':>10} {'windowed':>10}")
+    for n in (100, 500, 900, 100_000):
+        text = "ab" * (n // 4) + "ba" * (n // 4)  # A palindrome, so nothing short-circuits
+        cases = [
+            ("reverse", _reverse_sliced, reverse_string, (text,)),
+            ("is_palindrome", _is_palindrome_sliced, is_palindrome, (text,)),
+            ("count_char", _count_char_sliced, count_char, (text, "a")),
+        ]
+        for name, old, new, args in cases:
+            # The sliced versions cannot go past the recursion limit
+            old_time = f"{_best(old, *args) * 1e3:8.2f}ms" if n < 950 else f"{'-':>10}"
+            print(f"{n:>9} {name:>14} {old_time} {_best(new, *args) * 1e3:8.2f}ms")
+
+    log = b"\n".join([b"level", b"GET", b"racecar", b"/index.html", b"noon"] * 200_000)
+    count = log.count(b"\n") + 1
+    start = time.perf_counter()
+    flags = palindrome_flags_buffer(log)
+    elapsed = time.perf_counter() - start
+    print(f"\npalindrome_flags_buffer over {count:,} log tokens: {elapsed:.3f}s "
+          f"({count / elapsed:,.0f} tokens/s, {sum(flags):,} palindromes)")
+    start = time.perf_counter()
+    counts = count_char_buffer(log, "e")
+    elapsed = time.perf_counter() - start
+    print(f"count_char_buffer over {count:,} log tokens: {elapsed:.3f}s "
+          f"({count / elapsed:,.0f} tokens/s, {sum(counts):,} matches)")
+
+
+if __name__ == "__main__":
+    print(reverse_string("hello"))  # Expected: "olleh"
+    print(is_palindrome("racecar"))  # Expected: True
+    print(count_char("banana", "a"))  # Expected: 3
+
+    # Far past the recursion limit of the slicing versions
+    long_text = "abc" * 100_000
+    print(reverse_string(long_text) == long_text[::-1])  # Expected: True
+    print(is_palindrome(long_text + long_text[::-1]))  # Expected: True
+    print(count_char(long_text, "c"))  # Expected: 100000
+
+    tokens = list(split_tokens(b"madam\nhello\nlevel\n\nworld"))
+    print(reverse_many(tokens))  # Expected: [b'madam', b'olleh', b'level', b'dlrow']
+    print(list(palindrome_flags(tokens)))  # Expected: [1, 0, 1, 0]
+    print(list(count_char_many(["banana", b"bandana", memoryview(b"papaya")], "a")))  # Expected: [3, 3, 3]
+    print(list(palindrome_flags_buffer(b"noon\nGET\nlevel")))  # Expected: [1, 0, 1]
+
+    if "--bench" in sys.argv:
+        benchmark()